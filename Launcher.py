@@ -0,0 +1,155 @@
+from importlib import import_module
+from signal import signal, SIGINT
+from sys import exit
+
+from evdev import ecodes
+
+from lib.terminate_application import signal_handler
+from lib.matrix_configuration import options, layout, RGBMatrix
+from lib.async_runtime import AsyncRuntime
+from lib.delta_renderer import DeltaRenderer
+from lib.frame_presenter import FramePresenter
+from lib.frame_profiler import FrameProfiler
+from lib import headless_graphics as graphics
+
+
+DELAY_IN_SECONDS = .05
+GAMES = ['Pong', 'Snake', 'Starfighter']
+
+
+class Menu:
+    def __init__(self, panel, games: list):
+        """
+        Menu constructor
+        :param panel: canvas to display
+        :param games: list of game names
+        """
+        self._matrix = panel
+        self._font = graphics.Font()
+        self._font.LoadFont("fonts/4x6.bdf")
+        self._color = graphics.Color(150, 150, 150)
+        self._selected_color = graphics.Color(255, 255, 0)
+
+        self.games = games
+        self.selected = 0
+        self.stick = 0
+
+    def move(self, direction: int) -> None:
+        """
+        Move selection up or down, wraps around
+        :param direction: -1 for up, 1 for down
+        :return: None
+        """
+        self.selected = (self.selected + direction) % len(self.games)
+
+    def draw(self) -> None:
+        """
+        Draw the game list with the selected game highlighted
+        :return: None
+        """
+        self._matrix.Fill(0, 0, 0)
+
+        for index, name in enumerate(self.games):
+            y = 8 + index * 8
+            if index == self.selected:
+                graphics.DrawText(self._matrix, self._font, 2, y, self._selected_color, f'>{name}')
+            else:
+                graphics.DrawText(self._matrix, self._font, 6, y, self._color, name)
+
+
+def handle_event(event, menu: Menu):
+    """
+    Handle single user controller event
+    :param event: input event
+    :param menu: menu object to select the game
+    :return: name of the game to start (or None)
+    """
+    btn_a = 304
+
+    if event.type == ecodes.EV_KEY and event.value == 1 and event.code == btn_a:
+        return menu.games[menu.selected]
+
+    if event.type == ecodes.EV_ABS:
+        if event.code == ecodes.ABS_HAT0Y and event.value:
+            menu.move(event.value)
+
+        if event.code == ecodes.ABS_Y:
+            # analog stick moves the selection once per deflection
+            stick = 1 if event.value > 245 else -1 if event.value < 10 else 0
+            if stick and not menu.stick:
+                menu.move(stick)
+            menu.stick = stick
+
+    return None
+
+
+def load_game(name: str):
+    """
+    Import game module, later calls return the already imported module
+    :param name: game name
+    :return: game module
+    """
+    return import_module(name)
+
+
+def main(matrix, controller) -> None:
+    """
+    Show the game menu and run the selected games in this process, matrix and controller stay open
+    :param matrix: RGBMatrix object
+    :param controller: controller object read on the launcher event loop
+    :return: None
+    """
+    runtime = AsyncRuntime(controller=controller)
+    scheduler = runtime.scheduler(step=DELAY_IN_SECONDS)
+
+    # one canvas pool for menu and games
+    presenter = FramePresenter(matrix=matrix)
+    renderer = DeltaRenderer(target=presenter.canvas, width=layout.width, height=layout.height)
+    menu = Menu(panel=renderer.frame, games=GAMES)
+    profilers = {}
+    shown = None
+
+    while True:
+        scheduler.wait()
+
+        game = None
+        for event in runtime.inputs.snapshot():
+            game = handle_event(event, menu) or game
+
+        if game:
+            module = load_game(game)
+            if game not in profilers:
+                profilers[game] = FrameProfiler(name=game)
+
+            module.main(matrix=matrix,
+                        scheduler=runtime.scheduler(step=module.DELAY_IN_SECONDS),
+                        profiler=profilers[game],
+                        events=runtime.inputs,
+                        presenter=presenter)
+
+            # the game drew into the pool canvases, ignore input left from the game
+            runtime.inputs.snapshot()
+            scheduler.reset()
+            renderer.invalidate()
+            shown = None
+
+        if shown != menu.selected:
+            shown = menu.selected
+            renderer.begin()
+            menu.draw()
+            renderer.mark(0, 0, layout.width, layout.height)
+            renderer.present(presenter.canvas, presenter.slot)
+            presenter.swap()
+
+
+if __name__ == '__main__':
+    signal(SIGINT, signal_handler)
+
+    from lib.stadia_controller import get_gamepad
+
+    gamepad = get_gamepad()
+    if not gamepad:
+        print('No Google Stadia controller found')
+        exit(1)
+
+    main(matrix=RGBMatrix(options=options), controller=gamepad)
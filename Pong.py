@@ -1,19 +1,29 @@
+from math import isqrt
 from random import random
-from threading import Thread
-from time import sleep
 from signal import signal, SIGINT
 
 from evdev import ecodes
-from rgbmatrix import RGBMatrix, graphics
 
 from lib.terminate_application import signal_handler
-from lib.collision_helper import check_circle_line_collision
-from lib.matrix_configuration import options
-from lib.stadia_controller import gamepad
+from lib.collision_helper import sweep_circle_segment
+from lib.matrix_configuration import options, layout, vsync_period, RGBMatrix
+from lib.delta_renderer import DeltaRenderer
+from lib.frame_presenter import FramePresenter
+from lib.split_presenter import SPLIT, SplitPresenter
+from lib.frame_scheduler import FrameScheduler
+from lib.async_runtime import AsyncRuntime
+from lib.frame_profiler import FrameProfiler
+from lib.effects_timeline import Timeline, Flash, Banner
+from lib import headless_graphics as graphics
 
 
 DELAY_IN_SECONDS = .075
 
+# fixed point ball motion: subpixels per pixel, ball speed in pixels per second on each axis
+SUBPIXELS = 256
+BALL_SPEED = 80 / 3
+MAX_BOUNCES = 4
+
 
 class Interface:
     def __init__(self, panel):
@@ -29,9 +39,9 @@ class Interface:
         Draw the game on display
         :return: None
         """
-        graphics.DrawLine(self._matrix, 0, 0, 63, 0, self._color)
-        graphics.DrawLine(self._matrix, 0, 31, 63, 31, self._color)
-        graphics.DrawLine(self._matrix, 63, 0, 63, 31, self._color)
+        graphics.DrawLine(self._matrix, 0, 0, layout.right, 0, self._color)
+        graphics.DrawLine(self._matrix, 0, layout.bottom, layout.right, layout.bottom, self._color)
+        graphics.DrawLine(self._matrix, layout.right, 0, layout.right, layout.bottom, self._color)
 
 
 class Paddle:
@@ -43,9 +53,13 @@ class Paddle:
         self._matrix = panel
         self._color = graphics.Color(200, 200, 200)
         self.pos_x = 1
-        self.pos_y = 16
-        self.height = 6
-        self.speed = 2
+        self.pos_y = layout.center_y
+        self.height = 6 * layout.scale
+        self.speed = 2 * layout.scale
+
+        # movement limits keep the paddle inside the borders
+        self.min_y = self.height // 2 + self.speed
+        self.max_y = layout.bottom - self.height // 2 - self.speed
 
     def draw(self) -> None:
         """
@@ -68,98 +82,155 @@ class Paddle:
 
 
 class Ball:
-    def __init__(self, panel):
+    def __init__(self, panel, step: float = DELAY_IN_SECONDS):
         """
-        Ball constructor
+        Ball constructor, position and velocity are integer subpixels (1 / SUBPIXELS pixel)
         :param panel: canvas to display
+        :param step: simulation step in seconds
         """
         self._matrix = panel
         self._color = graphics.Color(10, 10, 200)
-        self._reset_ball()
 
-        self.radius = 2
+        self.radius = 2 * layout.scale
+
+        # half widths of the filled rows inside the circle outline
+        self._fill = [(dy, isqrt(self.radius * self.radius - dy * dy - 1))
+                      for dy in range(1 - self.radius, self.radius)]
+
+        # bounce limits inside the borders
+        self.max_x = layout.right - self.radius - 1
+        self.min_y = 2 * self.radius
+        self.max_y = layout.bottom - self.radius - 1
+
+        # speed per second converted once into subpixels per simulation step
+        self.speed = round(BALL_SPEED * layout.scale * SUBPIXELS * step)
+
+        self._reset_ball()
 
     @staticmethod
     def generate_random_number() -> int:
         """
-        Generate random number -2 or 2
+        Generate random direction -1 or 1
         :return: value as integer
         """
-        random_number = 2 if random() < 0.5 else -2
+        random_number = 1 if random() < 0.5 else -1
 
         return random_number
 
     def _reset_ball(self) -> None:
         """
-        Reset ball x,y position
+        Reset ball x,y position and velocity
         :return: None
         """
-        self.pos_x = int(options.cols // 2 + 10)
-        self.pos_y = int(options.rows // 2)
-        self.speed_x = Ball.generate_random_number()
-        self.speed_y = Ball.generate_random_number()
+        self.x = (layout.center_x + layout.x(10)) * SUBPIXELS
+        self.y = layout.center_y * SUBPIXELS
+        self.velocity_x = Ball.generate_random_number() * self.speed
+        self.velocity_y = Ball.generate_random_number() * self.speed
+
+        self.pos_x = self.x // SUBPIXELS
+        self.pos_y = self.y // SUBPIXELS
 
-    def _move(self) -> None:
+    def _first_hit(self, dx: int, dy: int, paddle):
         """
-        Move the ball
-        :return: None
+        Find the first bounce on the path of this step
+        :param dx: path x distance in subpixels
+        :param dy: path y distance in subpixels
+        :param paddle: paddle object
+        :return: tuple (path fraction, normal x, normal y) or None
         """
-        global lives
+        hits = []
+
+        if dx > 0 and self.x + dx > self.max_x * SUBPIXELS:
+            hits.append(((self.max_x * SUBPIXELS - self.x) / dx, -1, 0))
+
+        if dy < 0 and self.y + dy < self.min_y * SUBPIXELS:
+            hits.append(((self.min_y * SUBPIXELS - self.y) / dy, 0, 1))
+        elif dy > 0 and self.y + dy > self.max_y * SUBPIXELS:
+            hits.append(((self.max_y * SUBPIXELS - self.y) / dy, 0, -1))
 
-        self.pos_x += self.speed_x
-        self.pos_y += self.speed_y
+        contact = sweep_circle_segment(self.x, self.y, dx, dy, self.radius * SUBPIXELS,
+                                       paddle.pos_x * SUBPIXELS, (paddle.pos_y - paddle.height // 2) * SUBPIXELS,
+                                       paddle.pos_x * SUBPIXELS, (paddle.pos_y + paddle.height // 2) * SUBPIXELS)
+        if contact:
+            hits.append(contact)
 
-        if self.pos_x <= 0:
-            lives -= 1
-            flicker()
+        return min(hits) if hits else None
+
+    def move(self, paddle) -> bool:
+        """
+        Move the ball one simulation step, bounces at borders and paddle anywhere on the path
+        :param paddle: paddle object
+        :return: bool (True if ball was lost and reset)
+        """
+        remaining = 1.0
+
+        for _ in range(MAX_BOUNCES):
+            dx = round(self.velocity_x * remaining)
+            dy = round(self.velocity_y * remaining)
+
+            hit = self._first_hit(dx, dy, paddle)
+            if hit is None:
+                self.x += dx
+                self.y += dy
+                break
+
+            # move to the contact, mirror the velocity at the contact normal and continue with the rest of the path
+            fraction, normal_x, normal_y = hit
+            self.x += round(dx * fraction)
+            self.y += round(dy * fraction)
+
+            dot = self.velocity_x * normal_x + self.velocity_y * normal_y
+            self.velocity_x = round(self.velocity_x - 2 * dot * normal_x)
+            self.velocity_y = round(self.velocity_y - 2 * dot * normal_y)
+            remaining *= 1.0 - fraction
+
+        if self.x <= 0:
             self._reset_ball()
+            return True
 
-        if not self.pos_x <= 60:
-            self.speed_x *= -1
+        self.pos_x = self.x // SUBPIXELS
+        self.pos_y = self.y // SUBPIXELS
 
-        if not 4 <= self.pos_y <= 28:
-            self.speed_y *= -1
+        return False
 
     def draw(self) -> None:
         """
         Draw the ball
         :return: None
         """
-        self._move()
-
         graphics.DrawCircle(self._matrix, self.pos_x, self.pos_y, self.radius, self._color)
-        graphics.DrawLine(self._matrix, self.pos_x - 1, self.pos_y - 1, self.pos_x + 1, self.pos_y - 1, self._color)
-        graphics.DrawLine(self._matrix, self.pos_x - 1, self.pos_y, self.pos_x + 1, self.pos_y, self._color)
-        graphics.DrawLine(self._matrix, self.pos_x - 1, self.pos_y + 1, self.pos_x + 1, self.pos_y + 1, self._color)
 
+        for dy, half in self._fill:
+            y = self.pos_y + dy
+            graphics.DrawLine(self._matrix, self.pos_x - half, y, self.pos_x + half, y, self._color)
 
-def handle_input(controller, target) -> None:
+
+def handle_event(event, target) -> None:
     """
-    Handle user controller input
-    :param controller: controller object
+    Handle single user controller event
+    :param event: input event
     :param target: target object to move
     :return: None
     """
     abs_v = 17
 
-    for event in controller.read_loop():
-        if event.type == ecodes.EV_ABS:
-            if event.code == abs_v and event.value == -1 and target.pos_y >= 5:
-                target.pos_y -= target.speed
+    if event.type == ecodes.EV_ABS:
+        if event.code == abs_v and event.value == -1 and target.pos_y >= target.min_y:
+            target.pos_y -= target.speed
 
-            if event.code == abs_v and event.value == 1 and target.pos_y <= 26:
-                target.pos_y += target.speed
+        if event.code == abs_v and event.value == 1 and target.pos_y <= target.max_y:
+            target.pos_y += target.speed
 
 
-def flicker() -> None:
+def flicker(timeline: Timeline, font, font_color, lives: int) -> None:
     """
-    Flicker function for display
+    Schedule the flicker effect for a lost ball, runs without blocking the game loop
+    :param timeline: Timeline object
+    :param font: font for the message
+    :param font_color: color for the message
+    :param lives: remaining lives
     :return: None
     """
-    global matrix
-    global canvas
-    global lives
-
     if lives > 0:
         text = 'Next chance'
     elif lives == 0:
@@ -167,52 +238,127 @@ def flicker() -> None:
     else:
         text = 'You lost all'
 
-    for _ in range(3):
-        matrix.Fill(0, 0, 0)
-        sleep(.15)
-        matrix.Fill(200, 0, 0)
-        graphics.DrawText(canvas, font, 10, 20, fontColor, text)
-        sleep(.15)
+    timeline.add(Flash(colors=((0, 0, 0), (200, 0, 0)), interval=.15, duration=.9))
 
+    # text is not scaled, it stays centered
+    x, y = layout.anchor(10, 20)
+    for start in (.15, .45, .75):
+        timeline.add(Banner(font, font_color, text, x, y, duration=.15), delay=start, layer=1)
 
-if __name__ == "__main__":
-    signal(SIGINT, signal_handler)
 
-    matrix = RGBMatrix(options=options)
-    canvas = matrix.CreateFrameCanvas()
+def main(matrix, controller=None, scheduler=None, profiler=None, events=None, max_steps=None,
+         presenter=None) -> int:
+    """
+    Run the game until all lives are lost
+    :param matrix: RGBMatrix object (unused if a presenter is given)
+    :param controller: controller object read on an AsyncRuntime event loop, which paces the default scheduler (or None)
+    :param scheduler: FrameScheduler object (default paced by DELAY_IN_SECONDS)
+    :param profiler: FrameProfiler object
+    :param events: function or InputBuffer returning input events for a simulation step number (or None)
+    :param max_steps: stop after number of simulation steps (or None)
+    :param presenter: FramePresenter object (default rotates its own canvas pool)
+    :return: number of simulation steps run
+    """
+    profiler = profiler or FrameProfiler(name='Pong')
+
+    runtime = AsyncRuntime(controller=controller, profiler=profiler) if controller else None
+    if runtime:
+        scheduler = scheduler or runtime.scheduler(step=DELAY_IN_SECONDS)
+        events = runtime.inputs
+
+    # input buffers record the input to photon latency when the frame is displayed
+    on_shown = getattr(events, 'on_shown', None)
+
+    scheduler = scheduler or FrameScheduler(step=DELAY_IN_SECONDS)
+
+    own_presenter = presenter is None
+    presenter = presenter or FramePresenter(matrix=matrix, vsync_period=vsync_period)
+    renderer = DeltaRenderer(target=presenter.canvas, width=layout.width, height=layout.height)
+    timeline = Timeline()
     font = graphics.Font()
     font.LoadFont("fonts/4x6.bdf")
-    fontColor = graphics.Color(255, 255, 0)
+    font_color = graphics.Color(255, 255, 0)
 
     lives = 5
-    interface = Interface(panel=canvas)
-    paddle = Paddle(panel=canvas)
-    ball = Ball(panel=canvas)
+    step = 0
+    interface = Interface(panel=renderer.background)
+    paddle = Paddle(panel=renderer.frame)
+    ball = Ball(panel=renderer.frame, step=scheduler.step)
 
-    input_thread = Thread(target=handle_input, args=(gamepad, paddle,), daemon=True)
-    input_thread.start()
+    # static borders are drawn once into the background
+    interface.draw()
 
     while True:
-        matrix.Clear()
+        steps = scheduler.wait()
 
-        # game break condition
-        if lives <= 0:
+        # game break condition (after the last flicker)
+        if (lives <= 0 and not timeline) or step == max_steps:
             break
 
         # game logic
-        ball.draw()
-        interface.draw()
-        paddle.draw()
+        with profiler.stage('logic'):
+            for _ in range(steps):
+                if events:
+                    for event in events(step):
+                        handle_event(event, paddle)
+                step += 1
+                timeline.advance(scheduler.step)
+
+                # ball waits while effects are running, paddle collision is swept along the whole path
+                with profiler.stage('collision'):
+                    lost = not timeline and ball.move(paddle)
+
+                if lost:
+                    lives -= 1
+                    flicker(timeline, font, font_color, lives)
+
+                if (lives <= 0 and not timeline) or step == max_steps:
+                    break
+
+        # skip drawing when falling behind
+        if not scheduler.render_due():
+            continue
+
+        with profiler.stage('draw'):
+            renderer.begin()
+
+            ball.draw()
+            paddle.draw()
 
-        circle_list = [ball.pos_x, ball.pos_y, ball.radius]
-        line_list = [paddle.pos_x,
-                     paddle.pos_y - (paddle.height // 2),
-                     paddle.pos_x,
-                     paddle.pos_y + (paddle.height // 2)]
+            renderer.mark(ball.pos_x - ball.radius, ball.pos_y - ball.radius, 2 * ball.radius + 1, 2 * ball.radius + 1)
+            # paddle is marked as whole column
+            renderer.mark(paddle.pos_x - 1, 0, 2, layout.height)
 
-        if check_circle_line_collision(circle=circle_list, line=line_list):
-            ball.speed_x *= -1
+            # effects are overlays on the whole frame
+            if timeline.draw(renderer.frame):
+                renderer.mark(0, 0, layout.width, layout.height)
 
         # sync matrix canvas
-        matrix.SwapOnVSync(canvas)
-        sleep(DELAY_IN_SECONDS)
+        with profiler.stage('present'):
+            renderer.present(presenter.canvas, presenter.slot)
+
+        with profiler.stage('swap'):
+            presenter.swap(shown=on_shown() if on_shown else None)
+
+        profiler.frame()
+
+    if own_presenter:
+        presenter.close()
+
+    if runtime:
+        runtime.close()
+
+    return step
+
+
+if __name__ == "__main__":
+    signal(SIGINT, signal_handler)
+
+    from lib.stadia_controller import gamepad
+
+    if SPLIT:
+        # the matrix is refreshed in a presenter process, this process only simulates and draws
+        with SplitPresenter(width=layout.width, height=layout.height) as presenter:
+            main(matrix=None, controller=gamepad, presenter=presenter)
+    else:
+        main(matrix=RGBMatrix(options=options), controller=gamepad)
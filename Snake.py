@@ -1,15 +1,19 @@
-from random import randint
-from threading import Thread
-from time import sleep
+from collections import deque
 from signal import signal, SIGINT
 
 from evdev import ecodes
-from rgbmatrix import RGBMatrix, graphics
 
 from lib.terminate_application import signal_handler
-from lib.collision_helper import check_point_point_collision
-from lib.matrix_configuration import options
-from lib.stadia_controller import gamepad
+from lib.collision_helper import collide_point_point
+from lib.matrix_configuration import options, layout, vsync_period, RGBMatrix
+from lib.delta_renderer import DeltaRenderer
+from lib.frame_presenter import FramePresenter
+from lib.split_presenter import SPLIT, SplitPresenter
+from lib.free_cell_index import FreeCellIndex
+from lib.frame_scheduler import FrameScheduler
+from lib.async_runtime import AsyncRuntime
+from lib.frame_profiler import FrameProfiler
+from lib import headless_graphics as graphics
 
 
 DELAY_IN_SECONDS = .075
@@ -33,37 +37,36 @@ class Interface:
         :return: None
         """
         graphics.DrawText(self._matrix, self._font, 1, 6, self._fontcolor, f'{int(points)}')
-        graphics.DrawLine(self._matrix, 0, 7, options.cols - 1, 7, self._fontcolor)
+        graphics.DrawLine(self._matrix, 0, 7, layout.right, 7, self._fontcolor)
 
 
 class Fruit:
-    def __init__(self, panel, min_x: int, max_x: int, min_y: int, max_y: int):
+    def __init__(self, panel, free_cells: FreeCellIndex):
         """
         Fruit constructor
         :param panel: canvas to display
-        :param min_x: minimum x integer value
-        :param max_x: maximum x integer value
-        :param min_y: minimum y integer value
-        :param max_y: maximum y integer value
+        :param free_cells: index of free board cells
         """
         self._matrix = panel
-        self._min_x = int(min_x)
-        self._max_x = int(max_x)
-        self._min_y = int(min_y)
-        self._max_y = int(max_y)
+        self._free_cells = free_cells
 
         self.pos_x = None
         self.pos_y = None
 
         self.reset()
 
-    def reset(self) -> None:
+    def reset(self) -> bool:
         """
-        Reset fruit x,y position
-        :return: None
+        Reset fruit x,y position to a random free cell
+        :return: bool (False if no cell is free)
         """
-        self.pos_x = randint(int(self._min_x), int(self._max_x))
-        self.pos_y = randint(int(self._min_y), int(self._max_y))
+        position = self._free_cells.sample()
+        if position is None:
+            return False
+
+        self.pos_x, self.pos_y = position
+
+        return True
 
     def draw(self) -> None:
         """
@@ -81,13 +84,13 @@ class SnakeHead:
         """
         self._matrix = panel
         self._speed = 1
-        self.pos_x = int(options.cols // 2)
-        self.pos_y = int(options.rows // 2)
+        self.pos_x = layout.center_x
+        self.pos_y = layout.center_y
         self.direction = None
 
-    def _move(self) -> None:
+    def move(self) -> None:
         """
-        Move the snake in different directions
+        Move the snake one simulation step in current direction
         :return: None
         """
         if self.direction == "up":
@@ -107,107 +110,231 @@ class SnakeHead:
         Draw snake on canvas
         :return: None
         """
-        self._move()
         self._matrix.SetPixel(self.pos_x, self.pos_y, 0, 0, 255)
 
 
-class SnakeSegment:
-    def __init__(self, panel, x: int, y: int):
+class SnakeBody:
+    def __init__(self, panel, cols: int, rows: int, free_cells: FreeCellIndex = None):
         """
-        SnakeSegment constructor
+        SnakeBody constructor, ring buffer of segments plus occupancy grid
         :param panel: canvas to display
+        :param cols: board width
+        :param rows: board height
+        :param free_cells: index of free board cells to keep updated
+        """
+        self._matrix = panel
+        self._free_cells = free_cells
+        self._cols = int(cols)
+        self._segments = deque()
+        self._grid = bytearray(self._cols * int(rows))
+        self._changed = []
+
+    def __len__(self) -> int:
+        """
+        Get number of segments
+        :return: length as integer
+        """
+        return len(self._segments)
+
+    def occupied(self, x: int, y: int) -> bool:
+        """
+        Check if a board cell is covered by the body (x, y must be on the board)
         :param x: integer value for the x position
         :param y: integer value for the y position
+        :return: bool
         """
-        self._matrix = panel
-        self.pos_x = int(x)
-        self.pos_y = int(y)
+        return self._grid[y * self._cols + x] > 0
 
-    def draw(self) -> None:
+    def move(self, x: int, y: int, grow: bool) -> None:
         """
-        Draw snake on canvas
+        Push previous head position and pop the tail (unless growing)
+        :param x: integer value for the x position
+        :param y: integer value for the y position
+        :param grow: keep the tail segment
         :return: None
         """
-        self._matrix.SetPixel(self.pos_x, self.pos_y, 0, 100, 255)
+        self._segments.appendleft((x, y))
+        self._grid[y * self._cols + x] += 1
+        self._changed.append((x, y))
+
+        if self._free_cells:
+            self._free_cells.occupy(x, y)
+
+        if not grow:
+            tail_x, tail_y = self._segments.pop()
+            self._grid[tail_y * self._cols + tail_x] -= 1
+            self._changed.append((tail_x, tail_y))
+
+            if self._free_cells and not self._grid[tail_y * self._cols + tail_x]:
+                self._free_cells.release(tail_x, tail_y)
+
+    def draw(self) -> list:
+        """
+        Draw cells changed since last draw on canvas
+        :return: list of changed (x, y) positions
+        """
+        changed = self._changed
+        self._changed = []
+
+        for x, y in changed:
+            if self._grid[y * self._cols + x]:
+                self._matrix.SetPixel(x, y, 0, 100, 255)
+            else:
+                self._matrix.SetPixel(x, y, 0, 0, 0)
 
+        return changed
 
-def handle_input(controller, target) -> None:
+
+def handle_event(event, target) -> None:
     """
-    Handle user controller input
-    :param controller: controller object
+    Handle single user controller event
+    :param event: input event
     :param target: target object to set direction for move
     :return: None
     """
-    for event in controller.read_loop():
-        if event.type == ecodes.EV_ABS:
-            if event.code == ecodes.ABS_X:
-                if event.value > 245:
-                    target.direction = 'right'
-                if event.value < 10:
-                    target.direction = 'left'
+    if event.type == ecodes.EV_ABS:
+        if event.code == ecodes.ABS_X:
+            if event.value > 245:
+                target.direction = 'right'
+            if event.value < 10:
+                target.direction = 'left'
+
+        if event.code == ecodes.ABS_Y:
+            if event.value > 245:
+                target.direction = 'down'
+            if event.value < 10:
+                target.direction = 'up'
+
+
+def main(matrix, controller=None, scheduler=None, profiler=None, events=None, max_steps=None,
+         presenter=None) -> int:
+    """
+    Run the game until the snake collides
+    :param matrix: RGBMatrix object (unused if a presenter is given)
+    :param controller: controller object read on an AsyncRuntime event loop, which paces the default scheduler (or None)
+    :param scheduler: FrameScheduler object (default paced by DELAY_IN_SECONDS)
+    :param profiler: FrameProfiler object
+    :param events: function or InputBuffer returning input events for a simulation step number (or None)
+    :param max_steps: stop after number of simulation steps (or None)
+    :param presenter: FramePresenter object (default rotates its own canvas pool)
+    :return: number of simulation steps run
+    """
+    profiler = profiler or FrameProfiler(name='Snake')
 
-            if event.code == ecodes.ABS_Y:
-                if event.value > 245:
-                    target.direction = 'down'
-                if event.value < 10:
-                    target.direction = 'up'
+    runtime = AsyncRuntime(controller=controller, profiler=profiler) if controller else None
+    if runtime:
+        scheduler = scheduler or runtime.scheduler(step=DELAY_IN_SECONDS)
+        events = runtime.inputs
 
+    # input buffers record the input to photon latency when the frame is displayed
+    on_shown = getattr(events, 'on_shown', None)
 
-if __name__ == '__main__':
-    signal(SIGINT, signal_handler)
+    scheduler = scheduler or FrameScheduler(step=DELAY_IN_SECONDS)
 
-    matrix = RGBMatrix(options=options)
-    canvas = matrix.CreateFrameCanvas()
+    own_presenter = presenter is None
+    presenter = presenter or FramePresenter(matrix=matrix, vsync_period=vsync_period)
+    renderer = DeltaRenderer(target=presenter.canvas, width=layout.width, height=layout.height)
 
     score = 0
+    shown_score = None
     collision = False
+    step = 0
 
-    interface = Interface(panel=canvas)
-    fruit = Fruit(panel=canvas, min_x=0, max_x=int(options.cols - 1), min_y=8, max_y=int(options.rows - 1))
-    snake = SnakeHead(panel=canvas)
-    snake_tail_segments = []
+    # fruit can only spawn on playable cells below the interface
+    free_cells = FreeCellIndex(min_x=0, max_x=layout.right, min_y=9, max_y=layout.bottom)
 
-    input_thread = Thread(target=handle_input, args=(gamepad, snake, ), daemon=True)
-    input_thread.start()
+    interface = Interface(panel=renderer.frame)
+    snake = SnakeHead(panel=renderer.frame)
+    snake_body = SnakeBody(panel=renderer.frame, cols=layout.width, rows=layout.height, free_cells=free_cells)
+    free_cells.occupy(snake.pos_x, snake.pos_y)
+    fruit = Fruit(panel=renderer.frame, free_cells=free_cells)
 
     while True:
-        matrix.Clear()
+        steps = scheduler.wait()
 
         # game break condition
-        if collision:
+        if collision or step == max_steps:
             break
 
         # game logic
-        if check_point_point_collision(point_a=[snake.pos_x, snake.pos_y], point_b=[fruit.pos_x, fruit.pos_y]):
-            segment = SnakeSegment(panel=canvas, x=snake.pos_x, y=snake.pos_y)
-            snake_tail_segments.append(segment)
-            score += 1
-            fruit.reset()
+        with profiler.stage('logic'):
+            for _ in range(steps):
+                if events:
+                    for event in events(step):
+                        handle_event(event, snake)
+                step += 1
+
+                grow = collide_point_point(snake.pos_x, snake.pos_y, fruit.pos_x, fruit.pos_y)
+                if grow:
+                    score += 1
+
+                    # board is full
+                    if not fruit.reset():
+                        collision = True
+
+                # body follows the head: previous head position becomes the first segment
+                snake_body.move(snake.pos_x, snake.pos_y, grow)
+                snake.move()
+                free_cells.occupy(snake.pos_x, snake.pos_y)
+
+                with profiler.stage('collision'):
+                    if not -1 < snake.pos_x < layout.width or not 8 < snake.pos_y < layout.height:
+                        collision = True
+                    elif snake_body.occupied(snake.pos_x, snake.pos_y):
+                        collision = True
+
+                if collision or step == max_steps:
+                    break
+
+        # skip drawing when falling behind
+        if not scheduler.render_due():
+            continue
+
+        with profiler.stage('draw'):
+            renderer.begin()
+
+            # interface is static and only redrawn when the score changes
+            if score != shown_score:
+                renderer.restore(0, 0, layout.width, 8)
+                interface.draw(score)
+                shown_score = score
+
+            # body stays on the frame, only head and tail cells are redrawn
+            for x, y in snake_body.draw():
+                renderer.touch(x, y, 1, 1)
+
+            fruit.draw()
+            renderer.mark(fruit.pos_x, fruit.pos_y, 1, 1)
+
+            snake.draw()
+            renderer.mark(snake.pos_x, snake.pos_y, 1, 1)
+
+        # sync matrix canvas
+        with profiler.stage('present'):
+            renderer.present(presenter.canvas, presenter.slot)
 
-        fruit.draw()
+        with profiler.stage('swap'):
+            presenter.swap(shown=on_shown() if on_shown else None)
 
-        for index in range(len(snake_tail_segments) - 1, 0, - 1):
-            snake_tail_segments[index].pos_x = snake_tail_segments[index - 1].pos_x
-            snake_tail_segments[index].pos_y = snake_tail_segments[index - 1].pos_y
+        profiler.frame()
 
-        if len(snake_tail_segments) > 0:
-            snake_tail_segments[0].pos_x = snake.pos_x
-            snake_tail_segments[0].pos_y = snake.pos_y
+    if own_presenter:
+        presenter.close()
 
-        for item in snake_tail_segments:
-            item.draw()
+    if runtime:
+        runtime.close()
 
-        snake.draw()
+    return step
 
-        for item in snake_tail_segments:
-            if snake.pos_x == item.pos_x and snake.pos_y == item.pos_y:
-                collision = True
 
-        if not -1 < snake.pos_x < options.cols or not 8 < snake.pos_y < options.rows:
-            collision = True
+if __name__ == '__main__':
+    signal(SIGINT, signal_handler)
 
-        interface.draw(score)
+    from lib.stadia_controller import gamepad
 
-        # sync matrix canvas
-        matrix.SwapOnVSync(canvas)
-        sleep(DELAY_IN_SECONDS)
+    if SPLIT:
+        # the matrix is refreshed in a presenter process, this process only simulates and draws
+        with SplitPresenter(width=layout.width, height=layout.height) as presenter:
+            main(matrix=None, controller=gamepad, presenter=presenter)
+    else:
+        main(matrix=RGBMatrix(options=options), controller=gamepad)
@@ -1,23 +1,34 @@
-from time import sleep
-from threading import Thread
 from signal import signal, SIGINT
 
 from evdev import ecodes
-from rgbmatrix import RGBMatrix, graphics
 
 from lib.terminate_application import signal_handler
-from lib.matrix_configuration import options
-from lib.stadia_controller import gamepad
-from lib.collision_helper import check_point_rectangle_collision
+from lib.matrix_configuration import options, layout, vsync_period, RGBMatrix
+from lib.sprite_atlas import load_atlas
+from lib.spatial_hash import SpatialHash
+from lib.projectile_pool import ProjectilePool
+from lib.delta_renderer import DeltaRenderer
+from lib.frame_presenter import FramePresenter
+from lib.split_presenter import SPLIT, SplitPresenter
+from lib.frame_scheduler import FrameScheduler
+from lib.async_runtime import AsyncRuntime
+from lib.frame_profiler import FrameProfiler
+from lib import headless_graphics as graphics
 
 
 DELAY_IN_SECONDS = 0.075
+SPRITES = 'sprites/starfighter.atlas'
+
+# hit ships are drawn tinted for some simulation steps
+DAMAGE_TINT = (255, 255, 255)
+DAMAGE_STEPS = 2
 
 
 class Fighter:
 
     FIGHTER_SPEED = 1
     BULLET_SPEED = 2
+    BULLET_CAPACITY = 8
 
     def __init__(self, panel):
         """
@@ -25,37 +36,34 @@ class Fighter:
         :param panel: canvas to display
         """
         self._matrix = panel
-        self._icon = [
-            [2, 1, 1, 1, 0],
-            [0, 1, 1, 0, 0],
-            [2, 1, 1, 1, 1],
-            [0, 1, 1, 0, 0],
-            [2, 1, 1, 1, 0]
-        ]
+        self._sprite = load_atlas(SPRITES).sprite('fighter')
+        self._damaged_sprite = load_atlas(SPRITES).sprite('fighter', tint=DAMAGE_TINT)
         self._shield_color = graphics.Color(200, 200, 200)
 
-        self.width = len(self._icon[0])
-        self.height = len(self._icon)
+        self.width = self._sprite.width
+        self.height = self._sprite.height
+        self.damage = 0
         self.pos_x = 1
-        self.pos_y = int(options.rows // 2 - self.height // 2)
+        self.pos_y = layout.center_y - self.height // 2
 
         self.shield = 10
 
-        self.bullet_state = False
-        self.bullet_x = 0
-        self.bullet_y = 0
+        self.bullets = ProjectilePool(capacity=self.BULLET_CAPACITY)
+
+    def fire(self) -> None:
+        """
+        Fire a bullet (ignored if all bullets are in flight)
+        :return: None
+        """
+        self.bullets.fire(int(self.width), int(self.pos_y + self.height // 2), self.BULLET_SPEED, 0)
 
     def draw(self) -> None:
         """
         Draw the fighter on canvas
         :return: None
         """
-        for y, row in enumerate(self._icon):
-            for x, c in enumerate(row):
-                if c == 1:
-                    self._matrix.SetPixel(x + self.pos_x, y + self.pos_y, 100, 100, 100)
-                if c == 2:
-                    self._matrix.SetPixel(x + self.pos_x, y + self.pos_y, 200, 0, 0)
+        sprite = self._damaged_sprite if self.damage else self._sprite
+        sprite.draw(self._matrix, self.pos_x, self.pos_y)
 
         graphics.DrawLine(self._matrix, 1, 0, self.shield, 0, self._shield_color)
 
@@ -63,6 +71,7 @@ class Fighter:
 class Enemy:
 
     BULLET_SPEED = 3
+    BULLET_CAPACITY = 4
 
     def __init__(self, panel):
         """
@@ -70,30 +79,31 @@ class Enemy:
         :param panel: canvas to display
         """
         self._matrix = panel
-        self._icon = [
-            [0, 0, 0, 1, 2],
-            [0, 0, 1, 1, 2],
-            [1, 1, 1, 1, 0],
-            [0, 0, 1, 1, 2],
-            [0, 0, 0, 1, 2]
-        ]
+        self._sprite = load_atlas(SPRITES).sprite('enemy')
+        self._damaged_sprite = load_atlas(SPRITES).sprite('enemy', tint=DAMAGE_TINT)
         self._speed = 1
         self._shield_color = graphics.Color(200, 200, 200)
 
-        self.width = len(self._icon[0])
-        self.height = len(self._icon)
-        self.pos_x = int(options.cols - self.width) - 1
-        self.pos_y = int(options.rows // 2 - self.height // 2)
+        self.width = self._sprite.width
+        self.height = self._sprite.height
+        self.damage = 0
+        self.pos_x = layout.right - self.width
+        self.pos_y = layout.center_y - self.height // 2
 
         self.shield = 10
 
-        self.bullet_state = False
-        self.bullet_x = 0
-        self.bullet_y = 0
+        self.bullets = ProjectilePool(capacity=self.BULLET_CAPACITY)
 
-    def _move(self) -> tuple:
+    def fire(self) -> None:
+        """
+        Fire a bullet (ignored if all bullets are in flight)
+        :return: None
         """
-        Change y position and speed of the enemy
+        self.bullets.fire(self.pos_x, int(self.pos_y + self.height // 2), -self.BULLET_SPEED, 0)
+
+    def move(self) -> tuple:
+        """
+        Change y position and speed of the enemy for one simulation step
         :return: tuple
         """
         self.pos_y += self._speed
@@ -101,7 +111,7 @@ class Enemy:
         if self.pos_y <= 2:
             self._speed *= -1
 
-        if self.pos_y >= int(options.rows - self.height):
+        if self.pos_y >= layout.height - self.height:
             self._speed *= -1
 
         x = self.pos_x
@@ -114,131 +124,212 @@ class Enemy:
         Draw the enemy on canvas
         :return: None
         """
-        x1, y2 = self._move()
-
-        for y, row in enumerate(self._icon):
-            for x, c in enumerate(row):
-                if c == 1:
-                    self._matrix.SetPixel(x + x1, y + y2, 100, 100, 100)
-                if c == 2:
-                    self._matrix.SetPixel(x + x1, y + y2, 200, 0, 0)
+        sprite = self._damaged_sprite if self.damage else self._sprite
+        sprite.draw(self._matrix, self.pos_x, self.pos_y)
 
-        start_x = int(options.cols - 2)
-        end_x = int(options.cols - 2 - self.shield)
+        start_x = layout.width - 2
+        end_x = layout.width - 2 - self.shield
         graphics.DrawLine(self._matrix, start_x, 0, end_x, 0, self._shield_color)
 
 
-def handle_input(controller, target) -> None:
+def handle_event(event, target, pressed_states: dict) -> None:
     """
-    Handle user controller input
-    :param controller: controller object
+    Handle single user controller event
+    :param event: input event
     :param target: target object for trigger shoot
+    :param pressed_states: dict of stick states to update
     :return: None
     """
-    global pressed_states
-
     btn_a = 304
 
-    for event in controller.read_loop():
-        if event.type == ecodes.EV_KEY and event.value == 1:
-            if event.code == btn_a:
-                if not target.bullet_state:
-                    target.bullet_state = True
-                    target.bullet_x = int(target.width)
-                    target.bullet_y = int(target.pos_y + target.height // 2)
-
-        if event.type == ecodes.EV_ABS:
-            if event.code in [ecodes.ABS_X, ecodes.ABS_Y]:
-                if event.value > 245:
-                    pressed_states[event.code] = 1
-                elif event.value < 10:
-                    pressed_states[event.code] = -1
-                else:
-                    pressed_states[event.code] = 0
-
-
-def update_target_position(target) -> None:
+    if event.type == ecodes.EV_KEY and event.value == 1:
+        if event.code == btn_a:
+            target.fire()
+
+    if event.type == ecodes.EV_ABS:
+        if event.code in [ecodes.ABS_X, ecodes.ABS_Y]:
+            if event.value > 245:
+                pressed_states[event.code] = 1
+            elif event.value < 10:
+                pressed_states[event.code] = -1
+            else:
+                pressed_states[event.code] = 0
+
+
+def track_bullets(entities: SpatialHash, bullets: ProjectilePool) -> None:
+    """
+    Insert or move a bullet pool in the broad-phase by the bounding box of its bullets in flight
+    :param entities: broad-phase of ships and bullet pools
+    :param bullets: bullets to track
+    :return: None
+    """
+    bounds = bullets.bounds()
+
+    if bounds:
+        entities.insert(bullets, *bounds)
+    elif bullets in entities:
+        entities.remove(bullets)
+
+
+def bullet_hits(entities: SpatialHash, targets: dict) -> dict:
+    """
+    Retire bullets hitting their target ship, a pool is only tested against a ship sharing a cell
+    :param entities: broad-phase of ships and bullet pools (ships inserted first)
+    :param targets: dict of bullets and the ship they can hit
+    :return: dict of ship and number of hits
     """
-    Updates the target position on specific state
+    hits = dict.fromkeys(targets.values(), 0)
+
+    for ship, bullets in entities.pairs():
+        if targets.get(bullets) is ship:
+            hits[ship] += bullets.hit(ship.pos_x, ship.pos_y, ship.width, ship.height)
+
+    return hits
+
+
+def update_target_position(target, pressed_states: dict) -> None:
+    """
+    Updates the target position on specific state for one simulation step
     :param target: the target to update y position
+    :param pressed_states: dict of stick states
     :return: None
     """
-    while True:
-        if pressed_states[ecodes.ABS_Y] == 1 and target.pos_y < int(options.rows - target.height):
-            target.pos_y += target.FIGHTER_SPEED
-        elif pressed_states[ecodes.ABS_Y] == -1 and target.pos_y > 2:
-            target.pos_y -= target.FIGHTER_SPEED
+    if pressed_states[ecodes.ABS_Y] == 1 and target.pos_y < layout.height - target.height:
+        target.pos_y += target.FIGHTER_SPEED
+    elif pressed_states[ecodes.ABS_Y] == -1 and target.pos_y > 2:
+        target.pos_y -= target.FIGHTER_SPEED
 
-        sleep(0.05)
 
+def main(matrix, controller=None, scheduler=None, profiler=None, events=None, max_steps=None,
+         presenter=None) -> int:
+    """
+    Run the game until one shield is empty
+    :param matrix: RGBMatrix object (unused if a presenter is given)
+    :param controller: controller object read on an AsyncRuntime event loop, which paces the default scheduler (or None)
+    :param scheduler: FrameScheduler object (default paced by DELAY_IN_SECONDS)
+    :param profiler: FrameProfiler object
+    :param events: function or InputBuffer returning input events for a simulation step number (or None)
+    :param max_steps: stop after number of simulation steps (or None)
+    :param presenter: FramePresenter object (default rotates its own canvas pool)
+    :return: number of simulation steps run
+    """
+    profiler = profiler or FrameProfiler(name='Starfighter')
 
-if __name__ == '__main__':
-    signal(SIGINT, signal_handler)
+    runtime = AsyncRuntime(controller=controller, profiler=profiler) if controller else None
+    if runtime:
+        scheduler = scheduler or runtime.scheduler(step=DELAY_IN_SECONDS)
+        events = runtime.inputs
 
-    matrix = RGBMatrix(options=options)
-    canvas = matrix.CreateFrameCanvas()
+    # input buffers record the input to photon latency when the frame is displayed
+    on_shown = getattr(events, 'on_shown', None)
 
-    fighter = Fighter(panel=canvas)
-    enemy = Enemy(panel=canvas)
+    scheduler = scheduler or FrameScheduler(step=DELAY_IN_SECONDS)
 
-    pressed_states = {ecodes.ABS_X: 0, ecodes.ABS_Y: 0}
+    own_presenter = presenter is None
+    presenter = presenter or FramePresenter(matrix=matrix, vsync_period=vsync_period)
+    renderer = DeltaRenderer(target=presenter.canvas, width=layout.width, height=layout.height)
+    frame = renderer.frame
+
+    fighter = Fighter(panel=frame)
+    enemy = Enemy(panel=frame)
+
+    # broad-phase for bullet hits, ships and bullet pools are moved incrementally
+    entities = SpatialHash(width=layout.width, height=layout.height)
+    for ship in (fighter, enemy):
+        entities.insert(ship, ship.pos_x, ship.pos_y, ship.width, ship.height)
 
-    input_thread = Thread(target=handle_input, args=(gamepad, fighter,), daemon=True)
-    input_thread.start()
+    targets = {fighter.bullets: enemy, enemy.bullets: fighter}
 
-    update_thread = Thread(target=update_target_position, args=(fighter,), daemon=True)
-    update_thread.start()
+    pressed_states = {ecodes.ABS_X: 0, ecodes.ABS_Y: 0}
+    step = 0
 
     while True:
-        matrix.Clear()
+        steps = scheduler.wait()
 
         # game break condition
-        if fighter.shield <= 0 or enemy.shield <= 0:
+        if fighter.shield <= 0 or enemy.shield <= 0 or step == max_steps:
             break
 
         # game logic
-        fighter.draw()
+        with profiler.stage('logic'):
+            for _ in range(steps):
+                if events:
+                    for event in events(step):
+                        handle_event(event, fighter, pressed_states)
+                step += 1
+
+                update_target_position(fighter, pressed_states)
+                entities.move(fighter, fighter.pos_x, fighter.pos_y, fighter.width, fighter.height)
+
+                enemy.move()
+                entities.move(enemy, enemy.pos_x, enemy.pos_y, enemy.width, enemy.height)
 
-        if fighter.bullet_state and fighter.bullet_x < options.cols:
-            canvas.SetPixel(fighter.bullet_x, fighter.bullet_y, 0, 0, 200)
-            fighter.bullet_x += fighter.BULLET_SPEED
+                # enemy shoots again once its bullet is gone
+                if not len(enemy.bullets):
+                    enemy.fire()
 
-        if fighter.bullet_x >= int(options.cols):
-            fighter.bullet_state = False
-            fighter.bullet_x = 0
-            fighter.bullet_y = 0
+                fighter.bullets.advance(layout.width, layout.height)
+                enemy.bullets.advance(layout.width, layout.height)
 
-        enemy.draw()
+                with profiler.stage('collision'):
+                    for bullets in targets:
+                        track_bullets(entities, bullets)
 
-        if not enemy.bullet_state:
-            enemy.bullet_x = enemy.pos_x
-            enemy.bullet_y = int(enemy.pos_y + enemy.height // 2)
-            enemy.bullet_state = True
+                    for ship, hits in bullet_hits(entities, targets).items():
+                        ship.shield -= hits
+                        ship.damage = DAMAGE_STEPS if hits else max(ship.damage - 1, 0)
 
-        if enemy.bullet_state and enemy.bullet_x >= 0:
-            enemy.bullet_x -= enemy.BULLET_SPEED
-            canvas.SetPixel(enemy.bullet_x, enemy.bullet_y, 0, 200, 0)
+                if fighter.shield <= 0 or enemy.shield <= 0 or step == max_steps:
+                    break
 
-        if enemy.bullet_state and enemy.bullet_x <= 0:
-            enemy.bullet_state = False
+        # skip drawing when falling behind
+        if not scheduler.render_due():
+            continue
 
-        fighter_point = [fighter.bullet_x, fighter.bullet_y]
-        enemy_point = [enemy.bullet_x, enemy.bullet_y]
-        fighter_rectangle = [fighter.pos_x, fighter.pos_y, fighter.width, fighter.height]
-        enemy_rectangle = [enemy.pos_x, enemy.pos_y, enemy.width, enemy.height]
+        with profiler.stage('draw'):
+            renderer.begin()
 
-        if check_point_rectangle_collision(point=fighter_point, rectangle=enemy_rectangle):
-            fighter.bullet_state = False
-            fighter.bullet_x = 0
-            fighter.bullet_y = 0
-            enemy.shield -= 1
+            fighter.draw()
+            enemy.draw()
 
-        if check_point_rectangle_collision(point=enemy_point, rectangle=fighter_rectangle):
-            enemy.bullet_state = False
-            enemy.bullet_x = 0
-            enemy.bullet_y = 0
-            fighter.shield -= 1
+            # shield lines are marked as whole row
+            renderer.mark(0, 0, layout.width, 1)
+            renderer.mark(fighter.pos_x, fighter.pos_y, fighter.width, fighter.height)
+            renderer.mark(enemy.pos_x, enemy.pos_y, enemy.width, enemy.height)
+
+            for bullets, color in ((fighter.bullets, (0, 0, 200)), (enemy.bullets, (0, 200, 0))):
+                for slot in bullets.slots():
+                    x = int(bullets.x[slot])
+                    y = int(bullets.y[slot])
+                    frame.SetPixel(x, y, *color)
+                    renderer.mark(x, y, 1, 1)
 
         # sync matrix canvas
-        matrix.SwapOnVSync(canvas)
-        sleep(DELAY_IN_SECONDS)
+        with profiler.stage('present'):
+            renderer.present(presenter.canvas, presenter.slot)
+
+        with profiler.stage('swap'):
+            presenter.swap(shown=on_shown() if on_shown else None)
+
+        profiler.frame()
+
+    if own_presenter:
+        presenter.close()
+
+    if runtime:
+        runtime.close()
+
+    return step
+
+
+if __name__ == '__main__':
+    signal(SIGINT, signal_handler)
+
+    from lib.stadia_controller import gamepad
+
+    if SPLIT:
+        # the matrix is refreshed in a presenter process, this process only simulates and draws
+        with SplitPresenter(width=layout.width, height=layout.height) as presenter:
+            main(matrix=None, controller=gamepad, presenter=presenter)
+    else:
+        main(matrix=RGBMatrix(options=options), controller=gamepad)
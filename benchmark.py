@@ -0,0 +1,247 @@
+from argparse import ArgumentParser
+from json import dump, load
+from os import environ
+from platform import platform, python_version
+from random import Random, seed as seed_random
+from sys import exit
+from time import perf_counter, time_ns
+from tracemalloc import start as start_tracemalloc, stop as stop_tracemalloc, get_traced_memory
+
+# benchmarks always run on the headless display backend
+environ['MATRIX_BACKEND'] = 'headless'
+
+from evdev import InputEvent, ecodes
+
+from lib.matrix_configuration import options, layout, RGBMatrix
+from lib.frame_scheduler import FrameScheduler
+from lib.frame_profiler import FrameProfiler
+from lib.input_buffer import InputBuffer
+from lib.input_recorder import ReplayDevice
+
+import Pong
+import Snake
+import Starfighter
+
+
+DEFAULT_TICKS = 5000
+DEFAULT_SEED = 42
+
+
+def event(event_type: int, code: int, value: int) -> InputEvent:
+    """
+    Create input event stamped with the current wall clock time (like kernel events)
+    :param event_type: event type
+    :param code: event code
+    :param value: event value
+    :return: InputEvent object
+    """
+    sec, nsec = divmod(time_ns(), 1000000000)
+
+    return InputEvent(sec, nsec // 1000, event_type, code, value)
+
+
+def pong_script(rng: Random):
+    """
+    Create scripted input for Pong (random paddle moves)
+    :param rng: random generator
+    :return: function returning events for a simulation step
+    """
+    def events(step: int) -> list:
+        if rng.random() < 0.5:
+            return [event(ecodes.EV_ABS, ecodes.ABS_HAT0Y, rng.choice([-1, 1]))]
+        return []
+
+    return events
+
+
+def snake_script(rng: Random):
+    """
+    Create scripted input for Snake (random turns every few steps)
+    :param rng: random generator
+    :return: function returning events for a simulation step
+    """
+    def events(step: int) -> list:
+        if step % rng.randint(4, 12) == 0:
+            return [event(ecodes.EV_ABS, rng.choice([ecodes.ABS_X, ecodes.ABS_Y]), rng.choice([0, 255]))]
+        return []
+
+    return events
+
+
+def starfighter_script(rng: Random):
+    """
+    Create scripted input for Starfighter (stick moves and fire button)
+    :param rng: random generator
+    :return: function returning events for a simulation step
+    """
+    def events(step: int) -> list:
+        result = []
+        if step % 8 == 0:
+            result.append(event(ecodes.EV_ABS, ecodes.ABS_Y, rng.choice([0, 128, 255])))
+        if step % 4 == 0:
+            result.append(event(ecodes.EV_KEY, ecodes.BTN_SOUTH, 1))
+        return result
+
+    return events
+
+
+GAMES = {
+    'Pong': (Pong, pong_script),
+    'Snake': (Snake, snake_script),
+    'Starfighter': (Starfighter, starfighter_script)
+}
+
+
+def run_game(name: str, ticks: int, seed: int, profiler=None, replay: str = None) -> tuple:
+    """
+    Run a game headless and uncapped for a fixed number of ticks (restarts the game if it ends)
+    :param name: game name
+    :param ticks: number of simulation steps
+    :param seed: random seed for game and scripted input
+    :param profiler: FrameProfiler object (or None)
+    :param replay: input recording replayed instead of scripted input (or None)
+    :return: tuple (elapsed seconds, number of game runs)
+    """
+    module, script = GAMES[name]
+
+    seed_random(seed)
+    profiler = profiler or FrameProfiler(name=name, enabled=False)
+
+    if replay:
+        source = ReplayDevice(replay, realtime=False, repeat=True).step_source(module.DELAY_IN_SECONDS)
+    else:
+        source = script(Random(seed))
+
+    events = InputBuffer(profiler=profiler, source=source)
+
+    remaining = ticks
+    runs = 0
+    start = perf_counter()
+
+    while remaining > 0:
+        scheduler = FrameScheduler(step=module.DELAY_IN_SECONDS, throttle=False)
+        # new canvas objects on every swap like rgbmatrix, state kept per canvas object would leak
+        done = module.main(matrix=RGBMatrix(options=options, fresh_canvases=True),
+                           scheduler=scheduler,
+                           profiler=profiler,
+                           events=events,
+                           max_steps=remaining)
+        runs += 1
+
+        if not done:
+            break
+        remaining -= done
+
+    return perf_counter() - start, runs
+
+
+def benchmark(name: str, ticks: int, seed: int, replay: str = None) -> dict:
+    """
+    Benchmark a game: ticks per second, tick and input to photon latency percentiles and peak memory
+    :param name: game name
+    :param ticks: number of simulation steps
+    :param seed: random seed
+    :param replay: input recording replayed instead of scripted input (or None)
+    :return: dict of results
+    """
+    profiler = FrameProfiler(name=name, enabled=True, report_on_exit=False)
+    elapsed, runs = run_game(name, ticks, seed, profiler, replay)
+
+    # separate pass, tracing allocations slows down the game loop
+    start_tracemalloc()
+    run_game(name, ticks, seed, replay=replay)
+    peak_memory = get_traced_memory()[1]
+    stop_tracemalloc()
+
+    frame = profiler.histogram('frame')
+    input_lag = profiler.histogram('input_lag')
+
+    return {
+        'ticks': ticks,
+        'runs': runs,
+        'seconds': round(elapsed, 4),
+        'ticks_per_second': round(ticks / elapsed, 1),
+        'latency_ms': {
+            'p50': frame.percentile(50) / 1e6,
+            'p95': frame.percentile(95) / 1e6,
+            'p99': frame.percentile(99) / 1e6,
+            'max': frame.max / 1e6
+        },
+        'input_lag_ms': {
+            'p50': input_lag.percentile(50) / 1e6,
+            'p95': input_lag.percentile(95) / 1e6,
+            'p99': input_lag.percentile(99) / 1e6,
+            'max': input_lag.max / 1e6
+        },
+        'stages_p95_ms': {stage: histogram.percentile(95) / 1e6
+                          for stage, histogram in profiler.histograms.items() if stage not in ('frame', 'input_lag')},
+        'peak_memory_bytes': peak_memory
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compare ticks per second with a baseline result file
+    :param results: current results
+    :param baseline: baseline results
+    :param tolerance: allowed relative slowdown (e.g. 0.1 for 10%)
+    :return: list of regressed game names
+    """
+    regressions = []
+
+    for name, result in results['games'].items():
+        previous = baseline.get('games', {}).get(name)
+        if not previous:
+            continue
+
+        ratio = result['ticks_per_second'] / previous['ticks_per_second']
+        print(f'{name:<12} {ratio:>6.2f}x ticks/s compared to baseline')
+
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Deterministic headless benchmark of the games')
+    parser.add_argument('games', nargs='*', default=list(GAMES), help=f'games to run {list(GAMES)}')
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help='simulation steps per game')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='random seed')
+    parser.add_argument('--output', default='benchmark_results.json', help='json result file')
+    parser.add_argument('--replay', help='input recording replayed instead of scripted input')
+    parser.add_argument('--compare', help='baseline json result file')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed ticks/s regression')
+    args = parser.parse_args()
+
+    for game in args.games:
+        if game not in GAMES:
+            parser.error(f'unknown game {game}')
+
+    results = {
+        'python': python_version(),
+        'platform': platform(),
+        'panel': f'{layout.width}x{layout.height}',
+        'seed': args.seed,
+        'replay': args.replay,
+        'games': {}
+    }
+
+    print(f'{"game":<12}{"ticks/s":>10}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}{"peak KiB":>10}')
+
+    for game in args.games:
+        result = benchmark(game, args.ticks, args.seed, args.replay)
+        results['games'][game] = result
+
+        latency = result['latency_ms']
+        print(f'{game:<12}{result["ticks_per_second"]:>10.1f}'
+              f'{latency["p50"]:>9.3f}{latency["p95"]:>9.3f}{latency["p99"]:>9.3f}{latency["max"]:>9.3f}'
+              f'{result["peak_memory_bytes"] / 1024:>10.1f}')
+
+    with open(args.output, 'w') as result_file:
+        dump(results, result_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            if compare(results, load(baseline_file), args.tolerance):
+                exit(1)
@@ -0,0 +1,59 @@
+import asyncio
+
+from lib.frame_scheduler import FrameScheduler
+from lib.input_buffer import InputBuffer
+
+
+class AsyncRuntime:
+    def __init__(self, controller=None, profiler=None):
+        """
+        AsyncRuntime constructor, single event loop for frame timing and controller input
+        :param controller: evdev controller read with async_read_loop (or None)
+        :param profiler: FrameProfiler object recording the input to photon latency (or None)
+        """
+        self.loop = asyncio.new_event_loop()
+        self.inputs = InputBuffer(profiler=profiler)
+        self._tasks = []
+
+        if controller:
+            self._tasks.append(self.loop.create_task(self._read(controller)))
+
+    async def _read(self, controller) -> None:
+        """
+        Queue controller events as they arrive
+        :param controller: evdev controller
+        :return: None
+        """
+        async for event in controller.async_read_loop():
+            self.inputs.push(event)
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Run the event loop for a frame budget, input is read while waiting
+        :param seconds: time to wait in seconds
+        :return: None
+        """
+        self.loop.run_until_complete(asyncio.sleep(max(seconds, 0)))
+
+    def scheduler(self, step: float, **kwargs) -> FrameScheduler:
+        """
+        Create a frame scheduler that waits on the event loop
+        :param step: simulation step (frame period) in seconds
+        :param kwargs: further FrameScheduler arguments
+        :return: FrameScheduler object
+        """
+        return FrameScheduler(step=step, sleeper=self.sleep, **kwargs)
+
+    def close(self) -> None:
+        """
+        Cancel input tasks and close the event loop
+        :return: None
+        """
+        for task in self._tasks:
+            task.cancel()
+
+        if self._tasks:
+            self.loop.run_until_complete(asyncio.gather(*self._tasks, return_exceptions=True))
+
+        self._tasks = []
+        self.loop.close()
@@ -0,0 +1,121 @@
+class Glyph:
+    def __init__(self, advance: int, width: int, height: int, x_offset: int, y_offset: int, rows: list):
+        """
+        Glyph constructor
+        :param advance: horizontal advance in pixels (DWIDTH)
+        :param width: bitmap width in pixels
+        :param height: bitmap height in pixels
+        :param x_offset: bitmap x offset from origin
+        :param y_offset: bitmap y offset from baseline
+        :param rows: list of integer bit rows (msb is the left pixel)
+        """
+        self.advance = advance
+        self.width = width
+        self.height = height
+        self.x_offset = x_offset
+        self.y_offset = y_offset
+        self.rows = rows
+
+    def pixels(self) -> list:
+        """
+        Get lit pixels relative to glyph origin (x, baseline)
+        :return: list of (x, y) tuples
+        """
+        lit = []
+        top = -(self.height + self.y_offset)
+
+        for y, bits in enumerate(self.rows):
+            for x in range(self.width):
+                if bits & (1 << (self.width - 1 - x)):
+                    lit.append((self.x_offset + x, top + y))
+
+        return lit
+
+
+class BDFFont:
+    def __init__(self):
+        """
+        BDFFont constructor
+        """
+        self.height = 0
+        self.baseline = 0
+        self.default_char = 0
+        self.glyphs = {}
+
+    def load(self, path: str) -> None:
+        """
+        Parse a BDF font file into glyph bitmaps
+        :param path: path to bdf file
+        :return: None
+        """
+        glyph = None
+        code = None
+        bitmap = None
+
+        with open(path, 'r', encoding='latin-1') as bdf:
+            for line in bdf:
+                parts = line.split()
+                if not parts:
+                    continue
+
+                keyword = parts[0]
+
+                if bitmap is not None and keyword != 'ENDCHAR':
+                    bitmap.append(int(parts[0], 16) >> (len(parts[0]) * 4 - glyph[1]))
+                elif keyword == 'FONTBOUNDINGBOX':
+                    self.height = int(parts[2])
+                elif keyword == 'FONT_ASCENT':
+                    self.baseline = int(parts[1])
+                elif keyword == 'DEFAULT_CHAR':
+                    self.default_char = int(parts[1])
+                elif keyword == 'STARTCHAR':
+                    glyph = [0, 0, 0, 0, 0]
+                elif keyword == 'ENCODING':
+                    code = int(parts[1])
+                elif keyword == 'DWIDTH':
+                    glyph[0] = int(parts[1])
+                elif keyword == 'BBX':
+                    glyph[1:] = [int(value) for value in parts[1:5]]
+                elif keyword == 'BITMAP':
+                    bitmap = []
+                elif keyword == 'ENDCHAR':
+                    if code is not None and code >= 0:
+                        self.glyphs[code] = Glyph(*glyph, rows=bitmap)
+                    glyph = None
+                    code = None
+                    bitmap = None
+
+    def glyph(self, char: str):
+        """
+        Get glyph for a character (falls back to the default char)
+        :param char: single character
+        :return: Glyph or None
+        """
+        return self.glyphs.get(ord(char), self.glyphs.get(self.default_char))
+
+    def char_width(self, char: str) -> int:
+        """
+        Get advance width of a character
+        :param char: single character
+        :return: width as integer
+        """
+        glyph = self.glyph(char)
+
+        return glyph.advance if glyph else 0
+
+
+_FONTS = {}
+
+
+def load_font(path: str) -> BDFFont:
+    """
+    Get parsed BDF font, each file is parsed only once per process (do not modify the result)
+    :param path: path to bdf file
+    :return: BDFFont object
+    """
+    if path not in _FONTS:
+        font = BDFFont()
+        font.load(path)
+        _FONTS[path] = font
+
+    return _FONTS[path]
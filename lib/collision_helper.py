@@ -1,5 +1,7 @@
 from math import sqrt
 
+import numpy as np
+
 
 def check_circle_line_collision(circle: list, line: list) -> bool:
     """
@@ -44,3 +46,163 @@ def check_point_rectangle_collision(point: list, rectangle: list) -> bool:
     x_rect, y_rect, width, height = rectangle
 
     return (x_rect <= x_point <= x_rect + width) and (y_rect <= y_point <= y_rect + height)
+
+
+def collide_circle_line(cx, cy, cr, x1, y1, x2, y2) -> bool:
+    """
+    Check if circle is colliding with line (scalar values, no temporary lists)
+    :param cx: circle center x
+    :param cy: circle center y
+    :param cr: circle radius
+    :param x1: line start x (x1 <= x2)
+    :param y1: line start y (y1 <= y2)
+    :param x2: line end x
+    :param y2: line end y
+    :return: bool
+    """
+    closest_x = max(x1, min(cx, x2))
+    closest_y = max(y1, min(cy, y2))
+
+    return (cx - closest_x) ** 2 + (cy - closest_y) ** 2 <= cr * cr
+
+
+def sweep_circle_segment(x, y, dx, dy, radius, x1, y1, x2, y2):
+    """
+    Find the first contact of a circle moving along a path with a line segment (swept, no tunneling)
+    :param x: circle center x at path start
+    :param y: circle center y at path start
+    :param dx: path x distance
+    :param dy: path y distance
+    :param radius: circle radius
+    :param x1: line start x
+    :param y1: line start y
+    :param x2: line end x
+    :param y2: line end y
+    :return: tuple (path fraction 0.0 .. 1.0, contact normal x, contact normal y) or None
+    """
+    hit = None
+    line_x, line_y = x2 - x1, y2 - y1
+    length = sqrt(line_x * line_x + line_y * line_y)
+
+    # sides of the segment, moved by the radius towards the circle
+    if length:
+        normal_x, normal_y = -line_y / length, line_x / length
+        distance = (x - x1) * normal_x + (y - y1) * normal_y
+        if distance < 0:
+            normal_x, normal_y, distance = -normal_x, -normal_y, -distance
+
+        approach = dx * normal_x + dy * normal_y
+        if approach < 0:
+            t = max((radius - distance) / approach, 0.0) if distance >= radius else 0.0
+            projection = ((x + dx * t - x1) * line_x + (y + dy * t - y1) * line_y) / (length * length)
+
+            if t <= 1.0 and 0.0 <= projection <= 1.0:
+                hit = (t, normal_x, normal_y)
+
+    # round ends of the segment
+    a = dx * dx + dy * dy
+    for end_x, end_y in ((x1, y1), (x2, y2)):
+        offset_x, offset_y = x - end_x, y - end_y
+        b = offset_x * dx + offset_y * dy
+        c = offset_x * offset_x + offset_y * offset_y - radius * radius
+
+        if b >= 0 or not a:
+            continue
+
+        discriminant = b * b - a * c
+        if discriminant < 0:
+            continue
+
+        t = max((-b - sqrt(discriminant)) / a, 0.0)
+        if t <= 1.0 and (hit is None or t < hit[0]):
+            contact_x, contact_y = offset_x + dx * t, offset_y + dy * t
+            distance = sqrt(contact_x * contact_x + contact_y * contact_y) or 1.0
+            hit = (t, contact_x / distance, contact_y / distance)
+
+    return hit
+
+
+def collide_point_point(x1, y1, x2, y2) -> bool:
+    """
+    Check if two points are on same x, y coordinates (scalar values)
+    :param x1: point a x
+    :param y1: point a y
+    :param x2: point b x
+    :param y2: point b y
+    :return: bool
+    """
+    return x1 == x2 and y1 == y2
+
+
+def collide_point_rectangle(px, py, rx, ry, width, height) -> bool:
+    """
+    Check if a point is inside a rectangle (scalar values)
+    :param px: point x
+    :param py: point y
+    :param rx: rectangle x
+    :param ry: rectangle y
+    :param width: rectangle width
+    :param height: rectangle height
+    :return: bool
+    """
+    return rx <= px <= rx + width and ry <= py <= ry + height
+
+
+def collide_circles_lines(circles, lines) -> np.ndarray:
+    """
+    Check N circles against M lines in one call
+    :param circles: array-like of shape (N, 3) with (x, y, radius)
+    :param lines: array-like of shape (M, 4) with (x1, y1, x2, y2), x1 <= x2 and y1 <= y2
+    :return: array of shape (K, 2) with (circle index, line index) of hits
+    """
+    circles = np.asarray(circles, dtype=float).reshape(-1, 3)
+    lines = np.asarray(lines, dtype=float).reshape(-1, 4)
+
+    cx, cy, cr = circles[:, 0:1], circles[:, 1:2], circles[:, 2:3]
+
+    closest_x = np.clip(cx, lines[:, 0], lines[:, 2])
+    closest_y = np.clip(cy, lines[:, 1], lines[:, 3])
+    hits = (cx - closest_x) ** 2 + (cy - closest_y) ** 2 <= cr * cr
+
+    return np.argwhere(hits)
+
+
+def collide_points_points(points_a, points_b) -> np.ndarray:
+    """
+    Check N points against M points in one call
+    :param points_a: array-like of shape (N, 2) with (x, y)
+    :param points_b: array-like of shape (M, 2) with (x, y)
+    :return: array of shape (K, 2) with (index a, index b) of hits
+    """
+    points_a = np.asarray(points_a).reshape(-1, 2)
+    points_b = np.asarray(points_b).reshape(-1, 2)
+
+    hits = (points_a[:, 0:1] == points_b[:, 0]) & (points_a[:, 1:2] == points_b[:, 1])
+
+    return np.argwhere(hits)
+
+
+def collide_points_rectangles(points, rectangles, out: np.ndarray = None) -> np.ndarray:
+    """
+    Check N points against M rectangles in one call
+    :param points: array-like of shape (N, 2) with (x, y)
+    :param rectangles: array-like of shape (M, 4) with (x, y, width, height)
+    :param out: bool array of shape (N, M) receiving the hit matrix instead of index pairs (or None)
+    :return: array of shape (K, 2) with (point index, rectangle index) of hits (or out)
+    """
+    points = np.asarray(points).reshape(-1, 2)
+    rectangles = np.asarray(rectangles).reshape(-1, 4)
+
+    px, py = points[:, 0:1], points[:, 1:2]
+    rx, ry = rectangles[:, 0], rectangles[:, 1]
+
+    if out is None:
+        hits = (rx <= px) & (px <= rx + rectangles[:, 2]) & (ry <= py) & (py <= ry + rectangles[:, 3])
+        return np.argwhere(hits)
+
+    np.less_equal(rx, px, out=out)
+    np.logical_and(out, px <= rx + rectangles[:, 2], out=out)
+    np.logical_and(out, ry <= py, out=out)
+    np.logical_and(out, py <= ry + rectangles[:, 3], out=out)
+
+    return out
@@ -0,0 +1,215 @@
+import numpy as np
+
+from lib.palette import PALETTE, Palette, IndexedCanvas
+from lib.frame_recorder import default_recorder
+
+
+# above this number of regions one compare of their bounding box is cheaper
+MERGE_REGIONS = 8
+
+
+class _SlotState:
+    def __init__(self):
+        """
+        _SlotState constructor, what the canvas of a pool slot shows and which regions changed since
+        """
+        self.previous = None
+        self.lut_version = None
+        self.regions = None
+
+
+class DeltaRenderer:
+    def __init__(self, target, width: int, height: int, palette: Palette = None, recorder=None):
+        """
+        DeltaRenderer constructor, software frames hold palette indices converted to RGB on present
+        :param target: default canvas which receives the changed pixels
+        :param width: frame width in pixels
+        :param height: frame height in pixels
+        :param palette: Palette object (or None for the global palette)
+        :param recorder: FrameRecorder object which gets every presented frame (or None for FRAME_RECORD)
+        """
+        self._target = target
+        self.width = int(width)
+        self.height = int(height)
+        self.palette = palette or PALETTE
+
+        self.background = IndexedCanvas(self.width, self.height, self.palette)
+        self.frame = IndexedCanvas(self.width, self.height, self.palette)
+
+        # per pool slot (not per canvas object, rgbmatrix returns a new wrapper on every swap),
+        # a rotating canvas pool gets the changes of all frames it missed
+        self._slots = {}
+
+        self._dirty = []
+        self._last_dirty = []
+        self._touched = []
+        self._full = True
+
+        self.changed_pixels = 0
+
+        self.recorder = recorder or default_recorder(self.width, self.height)
+        self._recorded = np.zeros((self.height, self.width, 3), dtype=np.uint8) if self.recorder else None
+
+    def mark(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        Mark a region touched by an entity in this frame
+        :param x: region x position
+        :param y: region y position
+        :param width: region width
+        :param height: region height
+        :return: None
+        """
+        x1, y1 = max(int(x), 0), max(int(y), 0)
+        x2, y2 = min(int(x + width), self.width), min(int(y + height), self.height)
+
+        if x1 < x2 and y1 < y2:
+            self._dirty.append((x1, y1, x2, y2))
+
+    def touch(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        Mark a region changed persistently in this frame (not restored on next begin)
+        :param x: region x position
+        :param y: region y position
+        :param width: region width
+        :param height: region height
+        :return: None
+        """
+        x1, y1 = max(int(x), 0), max(int(y), 0)
+        x2, y2 = min(int(x + width), self.width), min(int(y + height), self.height)
+
+        if x1 < x2 and y1 < y2:
+            self._touched.append((x1, y1, x2, y2))
+
+    def restore(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        Restore the background of a region and touch it
+        :param x: region x position
+        :param y: region y position
+        :param width: region width
+        :param height: region height
+        :return: None
+        """
+        x1, y1 = max(int(x), 0), max(int(y), 0)
+        x2, y2 = min(int(x + width), self.width), min(int(y + height), self.height)
+
+        if x1 < x2 and y1 < y2:
+            self.frame.indices[y1:y2, x1:x2] = self.background.indices[y1:y2, x1:x2]
+            self._touched.append((x1, y1, x2, y2))
+
+    def invalidate(self) -> None:
+        """
+        Force a full frame restore on next begin and a full push to every target (content is unknown)
+        :return: None
+        """
+        self._full = True
+        self._slots = {}
+
+    def begin(self) -> None:
+        """
+        Start a new frame, restores the background of regions marked in the previous frame
+        :return: None
+        """
+        indices = self.frame.indices
+        background = self.background.indices
+
+        if self._full:
+            indices[:] = background
+        else:
+            for x1, y1, x2, y2 in self._dirty:
+                indices[y1:y2, x1:x2] = background[y1:y2, x1:x2]
+
+        self._last_dirty = self._dirty
+        self._dirty = []
+
+    def _merge(self, regions: list) -> list:
+        """
+        Merge many regions into their bounding box
+        :param regions: list of (x1, y1, x2, y2) tuples
+        :return: list of regions
+        """
+        if len(regions) <= MERGE_REGIONS:
+            return regions
+
+        return [(min(region[0] for region in regions),
+                 min(region[1] for region in regions),
+                 max(region[2] for region in regions),
+                 max(region[3] for region in regions))]
+
+    def present(self, target=None, slot: int = 0) -> int:
+        """
+        Push changed pixels to a target canvas, a palette LUT swap pushes the full frame
+        :param target: canvas which receives the changed pixels (or None for the default target)
+        :param slot: canvas pool slot of the target (FramePresenter.slot)
+        :return: number of changed pixels
+        """
+        target = target or self._target
+
+        # regions of this frame, None is the full frame
+        if self._full:
+            regions = None
+            self._full = False
+        else:
+            regions = self._last_dirty + self._dirty + self._touched
+        self._touched = []
+
+        for state in self._slots.values():
+            if state.regions is not None:
+                state.regions = None if regions is None else self._merge(state.regions + regions)
+
+        state = self._slots.get(slot)
+        if state is None:
+            state = self._slots[slot] = _SlotState()
+
+        lut_swapped = state.lut_version != self.palette.version
+        state.lut_version = self.palette.version
+        unknown = state.previous is None
+
+        if unknown:
+            state.previous = np.zeros_like(self.frame.indices)
+
+        if state.regions is None or lut_swapped:
+            regions = [(0, 0, self.width, self.height)]
+        else:
+            regions = state.regions
+        state.regions = []
+
+        indices = self.frame.indices
+        previous = state.previous
+        lut = self.palette.lut
+        target_pixels = getattr(target, 'pixels', None)
+        set_pixel = target.SetPixel
+        changed = 0
+
+        for x1, y1, x2, y2 in regions:
+            current = indices[y1:y2, x1:x2]
+
+            if unknown:
+                diff = np.ones(current.shape, dtype=bool)
+            else:
+                diff = current != previous[y1:y2, x1:x2]
+
+                # index 0 stays black in every LUT, all other colors change with a swap
+                if lut_swapped:
+                    diff |= current != 0
+
+            ys, xs = np.nonzero(diff)
+
+            if not len(ys):
+                continue
+
+            changed += len(ys)
+            previous[y1:y2, x1:x2] = current
+
+            if target_pixels is not None:
+                self.palette.convert(current, out=target_pixels[y1:y2, x1:x2])
+            else:
+                for y, x in zip((ys + y1).tolist(), (xs + x1).tolist()):
+                    red, green, blue = lut[indices[y, x]].tolist()
+                    set_pixel(x, y, red, green, blue)
+
+        self.changed_pixels = changed
+
+        if self.recorder:
+            self.recorder.record(self.palette.convert(self.frame.indices, out=self._recorded))
+
+        return changed
@@ -0,0 +1,194 @@
+from bisect import insort
+
+from lib import headless_graphics as graphics
+
+
+class Effect:
+    def __init__(self, duration: float):
+        """
+        Effect constructor, base class of timeline effects
+        :param duration: running time in seconds
+        """
+        self.duration = float(duration)
+
+    def draw(self, canvas, elapsed: float) -> None:
+        """
+        Draw the effect state at a point of its running time
+        :param canvas: canvas to draw on
+        :param elapsed: seconds since effect start
+        :return: None
+        """
+        raise NotImplementedError
+
+    def end(self) -> None:
+        """
+        Leave the final state after the last step, called once when the effect is removed
+        :return: None
+        """
+
+
+class Flash(Effect):
+    def __init__(self, colors: tuple, interval: float, duration: float):
+        """
+        Flash constructor, fills the canvas alternating between colors
+        :param colors: tuple of (red, green, blue) colors
+        :param interval: seconds per color
+        :param duration: running time in seconds
+        """
+        super().__init__(duration)
+        self.colors = colors
+        self.interval = float(interval)
+
+    def draw(self, canvas, elapsed: float) -> None:
+        """
+        Fill canvas with the color of the current interval
+        :param canvas: canvas to draw on
+        :param elapsed: seconds since effect start
+        :return: None
+        """
+        # integer microseconds, float floor division misses interval boundaries
+        index = int(elapsed * 1e6 + .5) // int(self.interval * 1e6 + .5)
+
+        canvas.Fill(*self.colors[index % len(self.colors)])
+
+
+class Fade(Effect):
+    def __init__(self, palette, duration: float, fade_in: bool = False):
+        """
+        Fade constructor, fades the whole frame by swapping the palette LUT
+        :param palette: Palette object of the renderer
+        :param duration: running time in seconds
+        :param fade_in: True fades in from black, False fades out to black
+        """
+        super().__init__(duration)
+        self.palette = palette
+        self.fade_in = fade_in
+
+    def draw(self, canvas, elapsed: float) -> None:
+        """
+        Set the palette fade level of the current point in time
+        :param canvas: canvas to draw on (unused, the LUT applies to all pixels)
+        :param elapsed: seconds since effect start
+        :return: None
+        """
+        level = min(elapsed / self.duration, 1.0) if self.duration else 1.0
+
+        self.palette.set_fade(level if self.fade_in else 1.0 - level)
+
+    def end(self) -> None:
+        """
+        Set the final fade level, the last drawn step may end before the duration
+        :return: None
+        """
+        self.palette.set_fade(1.0 if self.fade_in else 0.0)
+
+
+class Banner(Effect):
+    def __init__(self, font, color, text: str, x: int, y: int, duration: float):
+        """
+        Banner constructor, shows a text
+        :param font: Font object
+        :param color: Color object
+        :param text: text to show
+        :param x: start x coordinate
+        :param y: baseline y coordinate
+        :param duration: running time in seconds
+        """
+        super().__init__(duration)
+        self.font = font
+        self.color = color
+        self.text = text
+        self.x = x
+        self.y = y
+
+    def draw(self, canvas, elapsed: float) -> None:
+        """
+        Draw the text
+        :param canvas: canvas to draw on
+        :param elapsed: seconds since effect start
+        :return: None
+        """
+        graphics.DrawText(canvas, self.font, self.x, self.y, self.color, self.text)
+
+
+class Timeline:
+    def __init__(self):
+        """
+        Timeline constructor, schedules effects as overlay layers advanced by simulation time
+        """
+        # integer microseconds, summed steps do not drift
+        self._time = 0
+
+        # sorted (layer, order, start, end, effect) entries, unique order keeps insertion order per layer
+        self._entries = []
+        self._order = 0
+
+    @property
+    def time(self) -> float:
+        """
+        Get timeline time
+        :return: seconds as float
+        """
+        return self._time / 1e6
+
+    def __len__(self) -> int:
+        """
+        Get number of scheduled and running effects
+        :return: count as integer
+        """
+        return len(self._entries)
+
+    def add(self, effect: Effect, delay: float = 0.0, layer: int = 0) -> Effect:
+        """
+        Schedule an effect
+        :param effect: Effect object
+        :param delay: seconds from now until the effect starts
+        :param layer: overlay layer, higher layers are drawn on top
+        :return: the scheduled effect
+        """
+        start = self._time + round(delay * 1e6)
+        insort(self._entries, (layer, self._order, start, start + round(effect.duration * 1e6), effect))
+        self._order += 1
+
+        return effect
+
+    def advance(self, seconds: float) -> None:
+        """
+        Advance the timeline, finished effects are ended and removed
+        :param seconds: simulation time in seconds
+        :return: None
+        """
+        self._time += round(seconds * 1e6)
+
+        if self._entries:
+            for entry in self._entries:
+                if entry[3] <= self._time:
+                    entry[4].end()
+
+            self._entries = [entry for entry in self._entries if entry[3] > self._time]
+
+    def draw(self, canvas) -> bool:
+        """
+        Draw running effects from the lowest to the highest layer
+        :param canvas: canvas to draw on
+        :return: bool (True if any effect was drawn)
+        """
+        drawn = False
+
+        for _, _, start, _, effect in self._entries:
+            if start <= self._time:
+                effect.draw(canvas, (self._time - start) / 1e6)
+                drawn = True
+
+        return drawn
+
+    def clear(self) -> None:
+        """
+        Remove all effects, running effects are ended
+        :return: None
+        """
+        for _, _, start, _, effect in self._entries:
+            if start <= self._time:
+                effect.end()
+
+        self._entries = []
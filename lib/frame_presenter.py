@@ -0,0 +1,150 @@
+from os import environ
+from queue import Queue
+from threading import Thread
+from time import perf_counter
+
+import numpy as np
+
+
+# canvases in rotation: 1 single (legacy, tears), 2 double, 3 triple buffering (swap in a thread)
+BUFFERS = int(environ.get('FRAME_BUFFERS', '2'))
+
+
+def push_frame(canvas, frame: np.ndarray, previous: np.ndarray = None) -> np.ndarray:
+    """
+    Copy a frame onto a matrix canvas, canvases without pixel array get the changed pixels only
+    :param canvas: matrix canvas
+    :param frame: RGB frame
+    :param previous: RGB frame last pushed to this canvas (or None)
+    :return: RGB frame now on the canvas (or None for pixel arrays)
+    """
+    pixels = getattr(canvas, 'pixels', None)
+
+    if pixels is not None:
+        np.copyto(pixels, frame)
+        return None
+
+    if previous is None:
+        changed = np.ones(frame.shape[:2], dtype=bool)
+        previous = frame.copy()
+    else:
+        changed = np.any(frame != previous, axis=2)
+        np.copyto(previous, frame)
+
+    ys, xs = np.nonzero(changed)
+    for y, x in zip(ys.tolist(), xs.tolist()):
+        red, green, blue = frame[y, x].tolist()
+        canvas.SetPixel(x, y, red, green, blue)
+
+    return previous
+
+
+class FramePresenter:
+    def __init__(self, matrix, buffers: int = BUFFERS, framerate_fraction: int = 1, vsync_period: float = None,
+                 clock=perf_counter):
+        """
+        FramePresenter constructor, owns the pool of frame canvases and rotates them on swap
+        :param matrix: RGBMatrix object
+        :param buffers: number of canvases in rotation (1, 2 or 3)
+        :param framerate_fraction: show each frame for n refresh cycles (SwapOnVSync argument)
+        :param vsync_period: panel refresh period in seconds to count missed vsyncs (or None)
+        :param clock: clock function returning seconds
+        """
+        self.matrix = matrix
+        self.buffers = min(max(int(buffers), 1), 3)
+        self.framerate_fraction = int(framerate_fraction)
+        self.vsync_period = vsync_period
+
+        self.frames = 0
+        self.missed_vsyncs = 0
+        self.tearing_frames = 0
+
+        self._clock = clock
+        self._thread = None
+
+        # rgbmatrix wraps the same canvas in a new object on every swap, a canvas is identified by its pool slot
+        self.canvas = matrix.CreateFrameCanvas()
+        self.slot = 0
+
+        # the matrix returns its own initial canvas on the first swap, it joins the pool as last slot
+        self._front_slot = self.buffers - 1 if self.buffers > 1 else None
+
+        if self.buffers == 3:
+            self._free = Queue()
+            self._free.put((1, matrix.CreateFrameCanvas()))
+            self._ready = Queue(maxsize=1)
+            self._thread = Thread(target=self._swap_loop, daemon=True)
+            self._thread.start()
+
+    def _swapped(self, slot: int, ready: float, shown) -> None:
+        """
+        Update front slot and counters right after SwapOnVSync returned (in the swap thread for triple buffering)
+        :param slot: pool slot of the canvas now displayed
+        :param ready: clock time the frame was handed to swap()
+        :param shown: function called now that the frame is displayed (or None)
+        :return: None
+        """
+        now = self._clock()
+
+        if shown:
+            shown()
+
+        # a frame waits at most one refresh for the next vsync, each further refresh is a missed vsync
+        if self.vsync_period:
+            self.missed_vsyncs += int((now - ready) / (self.vsync_period * self.framerate_fraction))
+
+        self._front_slot = slot
+        self.frames += 1
+
+    def _swap_loop(self) -> None:
+        """
+        Swap ready canvases on vsync and return the previous ones to the pool (triple buffering thread)
+        :return: None
+        """
+        while True:
+            ready = self._ready.get()
+            if ready is None:
+                break
+
+            slot, canvas, ready_time, shown = ready
+            previous_slot = self._front_slot
+            previous = self.matrix.SwapOnVSync(canvas, self.framerate_fraction)
+            self._swapped(slot, ready_time, shown)
+            self._free.put((previous_slot, previous))
+
+    def swap(self, shown=None) -> None:
+        """
+        Display the current canvas and continue with the next free one
+        :param shown: function called when the frame is displayed, e.g. InputBuffer.on_shown() (or None)
+        :return: None
+        """
+        canvas = self.canvas
+        slot = self.slot
+        ready = self._clock()
+
+        # drawing into the displayed canvas shows half finished frames
+        if slot == self._front_slot:
+            self.tearing_frames += 1
+
+        if self.buffers == 3:
+            self._ready.put((slot, canvas, ready, shown))
+            self.slot, self.canvas = self._free.get()
+            return
+
+        previous_slot = self._front_slot
+        previous = self.matrix.SwapOnVSync(canvas, self.framerate_fraction)
+        self._swapped(slot, ready, shown)
+
+        if self.buffers == 2:
+            self.canvas = previous
+            self.slot = previous_slot
+
+    def close(self) -> None:
+        """
+        Stop the swap thread after all ready canvases are displayed
+        :return: None
+        """
+        if self._thread:
+            self._ready.put(None)
+            self._thread.join()
+            self._thread = None
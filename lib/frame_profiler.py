@@ -0,0 +1,202 @@
+from atexit import register
+from os import environ
+from time import perf_counter_ns
+
+
+# enable with FRAME_PROFILE=1, optional periodic dump every FRAME_PROFILE_DUMP seconds
+PROFILE = environ.get('FRAME_PROFILE', '0') not in ('', '0')
+DUMP_INTERVAL = float(environ.get('FRAME_PROFILE_DUMP', '0'))
+
+SUB_BUCKET_BITS = 3
+BUCKETS = 40 << SUB_BUCKET_BITS
+
+
+class LatencyHistogram:
+    def __init__(self):
+        """
+        LatencyHistogram constructor, fixed size log-linear buckets of nanoseconds
+        (8 buckets per power of two, about 9% resolution)
+        """
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value: int) -> int:
+        """
+        Get bucket index of a value
+        :param value: value in nanoseconds
+        :return: index as integer
+        """
+        length = value.bit_length()
+
+        if length <= SUB_BUCKET_BITS + 1:
+            return value
+
+        index = ((length - SUB_BUCKET_BITS) << SUB_BUCKET_BITS) + ((value >> (length - SUB_BUCKET_BITS - 1)) & 7)
+
+        return min(index, BUCKETS - 1)
+
+    @staticmethod
+    def bucket_limit(index: int) -> int:
+        """
+        Get upper value of a bucket
+        :param index: bucket index
+        :return: value in nanoseconds
+        """
+        if index < 2 << SUB_BUCKET_BITS:
+            return index
+
+        length = (index >> SUB_BUCKET_BITS) + SUB_BUCKET_BITS
+        sub = (index & 7) | 8
+
+        return ((sub + 1) << (length - SUB_BUCKET_BITS - 1)) - 1
+
+    def record(self, value: int) -> None:
+        """
+        Record one value
+        :param value: value in nanoseconds
+        :return: None
+        """
+        self.counts[self.bucket(value)] += 1
+        self.count += 1
+
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> int:
+        """
+        Get approximate percentile (bucket upper limit, never above max)
+        :param percent: percentile 0..100
+        :return: value in nanoseconds
+        """
+        if not self.count:
+            return 0
+
+        rank = max(1, int(self.count * percent / 100 + 0.5))
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_limit(index), self.max)
+
+        return self.max
+
+
+class _Stage:
+    def __init__(self, histogram: LatencyHistogram):
+        """
+        _Stage constructor
+        :param histogram: histogram to record into
+        """
+        self._histogram = histogram
+        self._start = 0
+
+    def __enter__(self):
+        self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._histogram.record(perf_counter_ns() - self._start)
+        return False
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class FrameProfiler:
+    def __init__(self, name: str, enabled: bool = PROFILE, dump_interval: float = DUMP_INTERVAL,
+                 report_on_exit: bool = True):
+        """
+        FrameProfiler constructor
+        :param name: name shown in reports
+        :param enabled: record timings (disabled profiler only returns a no-op stage)
+        :param dump_interval: print report every n seconds (0 disables periodic dump)
+        :param report_on_exit: print report when the application exits
+        """
+        self.name = name
+        self.enabled = enabled
+        self.histograms = {}
+
+        self._stages = {}
+        self._dump_interval = int(dump_interval * 1e9)
+        self._last_frame = 0
+        self._last_dump = perf_counter_ns()
+
+        if enabled and report_on_exit:
+            register(self.print_report)
+
+    def stage(self, name: str):
+        """
+        Get context manager which times a stage of the frame
+        :param name: stage name
+        :return: context manager
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self.histogram(name))
+
+        return stage
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """
+        Get (or create) a named histogram
+        :param name: histogram name
+        :return: LatencyHistogram object
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+
+        return histogram
+
+    def frame(self) -> None:
+        """
+        Mark end of a frame, records time since previous mark as frame time
+        :return: None
+        """
+        if not self.enabled:
+            return
+
+        now = perf_counter_ns()
+
+        if self._last_frame:
+            self.histogram('frame').record(now - self._last_frame)
+        self._last_frame = now
+
+        if self._dump_interval and now - self._last_dump >= self._dump_interval:
+            self._last_dump = now
+            self.print_report()
+
+    def report(self) -> str:
+        """
+        Create report with p50/p95/p99 and max per stage
+        :return: report as string
+        """
+        lines = [f'{self.name} profile (ms)',
+                 f'{"stage":<12}{"count":>8}{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}']
+
+        for name, histogram in self.histograms.items():
+            values = [histogram.percentile(50), histogram.percentile(95), histogram.percentile(99), histogram.max]
+            lines.append(f'{name:<12}{histogram.count:>8}' + ''.join(f'{value / 1e6:>9.3f}' for value in values))
+
+        return '\n'.join(lines)
+
+    def print_report(self) -> None:
+        """
+        Print report to stdout
+        :return: None
+        """
+        print(self.report())
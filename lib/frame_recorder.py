@@ -0,0 +1,337 @@
+from atexit import register
+from bisect import bisect_right
+from mmap import mmap, ACCESS_READ
+from os import environ
+from struct import Struct
+from time import perf_counter, perf_counter_ns, sleep
+
+import numpy as np
+
+
+# record every presented frame into this file (or empty for no recording)
+RECORD = environ.get('FRAME_RECORD', '')
+
+MAGIC = b'FRC2'
+INDEX_MAGIC = b'FRCI'
+
+# magic, width, height, keyframe interval
+HEADER = Struct('<4sHHH')
+
+# keyframe flag, microseconds since first frame, payload size
+FRAME = Struct('<BQI')
+
+# keyframe number, file offset
+INDEX = Struct('<IQ')
+
+# index offset, number of keyframes, number of frames, magic (last bytes of a closed recording)
+FOOTER = Struct('<QII4s')
+
+# payload segment: skip unchanged pixels, then count pixels of one color
+SEGMENT = np.dtype([('skip', '<u4'), ('count', '<u4'), ('red', 'u1'), ('green', 'u1'), ('blue', 'u1')])
+
+KEYFRAME_INTERVAL = 100
+
+
+def _pack(pixels: np.ndarray) -> np.ndarray:
+    """
+    Pack RGB pixels into one integer per pixel
+    :param pixels: array of shape (height, width, 3)
+    :return: flat uint32 array
+    """
+    pixels = pixels.reshape(-1, 3).astype(np.uint32)
+
+    return pixels[:, 0] << 16 | pixels[:, 1] << 8 | pixels[:, 2]
+
+
+def encode(packed: np.ndarray, previous: np.ndarray) -> bytes:
+    """
+    Encode the changed pixels of a frame as runs of one color
+    :param packed: packed pixels of the frame
+    :param previous: packed pixels of the previous frame (zeros for a keyframe)
+    :return: payload as bytes
+    """
+    changed = np.flatnonzero(packed != previous)
+
+    if not len(changed):
+        return b''
+
+    values = packed[changed]
+
+    # a segment ends at a gap of unchanged pixels or at a color change
+    breaks = np.flatnonzero((np.diff(changed) != 1) | (np.diff(values) != 0)) + 1
+    starts = np.concatenate(([0], breaks))
+    counts = np.diff(np.concatenate((starts, [len(changed)])))
+
+    positions = changed[starts]
+    ends = np.concatenate(([0], positions[:-1] + counts[:-1]))
+
+    segments = np.empty(len(starts), dtype=SEGMENT)
+    segments['skip'] = positions - ends
+    segments['count'] = counts
+    segments['red'] = values[starts] >> 16
+    segments['green'] = values[starts] >> 8
+    segments['blue'] = values[starts]
+
+    return segments.tobytes()
+
+
+def decode(payload, frame: np.ndarray) -> None:
+    """
+    Apply a payload onto a frame
+    :param payload: payload bytes (or memoryview)
+    :param frame: array of shape (height, width, 3), updated in place
+    :return: None
+    """
+    segments = np.frombuffer(payload, dtype=SEGMENT)
+
+    if not len(segments):
+        return
+
+    counts = segments['count'].astype(np.intp)
+    skips = segments['skip'].astype(np.intp)
+    starts = np.cumsum(skips) + np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # pixel positions of all segments, start of the segment plus offset inside
+    offsets = np.cumsum(counts) - counts
+    positions = np.arange(int(counts.sum())) + np.repeat(starts - offsets, counts)
+
+    colors = np.stack((segments['red'], segments['green'], segments['blue']), axis=1)
+    frame.reshape(-1, 3)[positions] = np.repeat(colors, counts, axis=0)
+
+
+class FrameRecorder:
+    def __init__(self, path: str, width: int, height: int, keyframe_interval: int = KEYFRAME_INTERVAL):
+        """
+        FrameRecorder constructor, writes frames as color runs of changed pixels with periodic keyframes
+        :param path: recording file path
+        :param width: frame width in pixels
+        :param height: frame height in pixels
+        :param keyframe_interval: number of frames between keyframes (seek granularity)
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.keyframe_interval = int(keyframe_interval)
+        self.frames = 0
+        self.size = HEADER.size
+
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, self.width, self.height, self.keyframe_interval))
+        self._index = []
+        self._start = None
+
+        self._previous = np.zeros(self.width * self.height, dtype=np.uint32)
+        self._blank = np.zeros_like(self._previous)
+
+    def record(self, pixels: np.ndarray) -> None:
+        """
+        Append a frame, stamped with the time since the first frame
+        :param pixels: array of shape (height, width, 3)
+        :return: None
+        """
+        now = perf_counter_ns() // 1000
+        if self._start is None:
+            self._start = now
+
+        packed = _pack(pixels)
+        keyframe = self.frames % self.keyframe_interval == 0
+
+        if keyframe:
+            self._index.append((self.frames, self.size))
+
+        payload = encode(packed, self._blank if keyframe else self._previous)
+        self._previous = packed
+
+        self._file.write(FRAME.pack(keyframe, now - self._start, len(payload)))
+        self._file.write(payload)
+        self.size += FRAME.size + len(payload)
+        self.frames += 1
+
+    def close(self) -> None:
+        """
+        Write keyframe index and close the recording file (recordings without index are scanned on playback)
+        :return: None
+        """
+        if self._file.closed:
+            return
+
+        for number, offset in self._index:
+            self._file.write(INDEX.pack(number, offset))
+
+        self._file.write(FOOTER.pack(self.size, len(self._index), self.frames, INDEX_MAGIC))
+        self._file.close()
+
+
+_RECORDER = None
+
+
+def default_recorder(width: int, height: int):
+    """
+    Get the recorder of FRAME_RECORD shared by all renderers of the process, closed on exit
+    :param width: frame width in pixels
+    :param height: frame height in pixels
+    :return: FrameRecorder object (or None if FRAME_RECORD is not set)
+    """
+    global _RECORDER
+
+    if RECORD and _RECORDER is None:
+        _RECORDER = FrameRecorder(RECORD, width, height)
+        register(_RECORDER.close)
+
+    return _RECORDER
+
+
+class FramePlayer:
+    def __init__(self, path: str):
+        """
+        FramePlayer constructor, memory maps a recording and decodes one frame at a time
+        :param path: recording file path
+        """
+        self.path = path
+
+        self._file = open(path, 'rb')
+        self._data = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+
+        magic, width, height, self.keyframe_interval = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a frame recording')
+
+        self.width = width
+        self.height = height
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+
+        self._end, self._keyframes, self.frames = self._read_index()
+        self._offset = HEADER.size
+        self._position = 0
+
+    def _read_index(self) -> tuple:
+        """
+        Read the keyframe index, scan the frame headers if the recording was not closed
+        :return: tuple (end of frames, list of (frame number, offset) keyframes, number of frames)
+        """
+        if len(self._data) >= HEADER.size + FOOTER.size:
+            end, count, frames, magic = FOOTER.unpack_from(self._data, len(self._data) - FOOTER.size)
+            if magic == INDEX_MAGIC:
+                keyframes = [INDEX.unpack_from(self._data, end + number * INDEX.size) for number in range(count)]
+                return end, keyframes, frames
+
+        keyframes = []
+        offset = HEADER.size
+        frames = 0
+
+        while offset + FRAME.size <= len(self._data):
+            keyframe, _, size = FRAME.unpack_from(self._data, offset)
+            if offset + FRAME.size + size > len(self._data):
+                break
+
+            if keyframe:
+                keyframes.append((frames, offset))
+            offset += FRAME.size + size
+            frames += 1
+
+        return offset, keyframes, frames
+
+    def read(self) -> int:
+        """
+        Decode the next frame into self.frame
+        :return: microseconds since the first frame (or -1 at the end of the recording)
+        """
+        if self._position >= self.frames:
+            return -1
+
+        keyframe, timestamp, size = FRAME.unpack_from(self._data, self._offset)
+        payload = self._offset + FRAME.size
+
+        if keyframe:
+            self.frame.fill(0)
+        decode(memoryview(self._data)[payload:payload + size], self.frame)
+
+        self._offset = payload + size
+        self._position += 1
+
+        return timestamp
+
+    def seek(self, number: int) -> None:
+        """
+        Continue at a frame, the next read() returns it (decoding starts at the nearest keyframe before it)
+        :param number: frame number
+        :return: None
+        """
+        number = min(max(int(number), 0), self.frames)
+        keyframe = bisect_right(self._keyframes, (number, self._end)) - 1
+
+        # decoding forward is cheaper than starting again at the keyframe
+        if keyframe >= 0:
+            start, offset = self._keyframes[keyframe]
+            if not start <= self._position <= number:
+                self._position, self._offset = start, offset
+
+        while self._position < number:
+            self.read()
+
+    def play(self, presenter, fps: float = None, repeat: bool = False) -> None:
+        """
+        Stream frames to a presenter at the recorded timing or a fixed frame rate
+        :param presenter: FramePresenter object
+        :param fps: frames per second (or None for the recorded timing)
+        :param repeat: start again at the end of the recording (attract mode)
+        :return: None
+        """
+        from lib.frame_presenter import push_frame
+
+        previous = {}
+
+        while True:
+            first = None
+
+            while True:
+                number = self._position
+                timestamp = self.read()
+                if timestamp < 0:
+                    break
+
+                if first is None:
+                    start, first, first_number = perf_counter(), timestamp, number
+                due = start + ((number - first_number) / fps if fps else (timestamp - first) / 1e6)
+
+                delay = due - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+
+                # keyed by pool slot, rgbmatrix returns a new canvas object on every swap
+                previous[presenter.slot] = push_frame(presenter.canvas, self.frame, previous.get(presenter.slot))
+                presenter.swap()
+
+            if not repeat or not self.frames:
+                break
+            self.seek(0)
+
+    def close(self) -> None:
+        """
+        Unmap and close the recording file
+        :return: None
+        """
+        self._data.close()
+        self._file.close()
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from signal import signal, SIGINT
+
+    from lib.terminate_application import signal_handler
+    from lib.matrix_configuration import options, RGBMatrix
+    from lib.frame_presenter import FramePresenter
+
+    parser = ArgumentParser(description='Play a frame recording on the matrix')
+    parser.add_argument('recording', help='recording file')
+    parser.add_argument('--fps', type=float, help='frames per second (default: recorded timing)')
+    parser.add_argument('--start', type=int, default=0, help='first frame number')
+    parser.add_argument('--repeat', action='store_true', help='play in a loop')
+    args = parser.parse_args()
+
+    signal(SIGINT, signal_handler)
+
+    player = FramePlayer(args.recording)
+    player.seek(args.start)
+    player.play(FramePresenter(matrix=RGBMatrix(options=options)), fps=args.fps, repeat=args.repeat)
+    player.close()
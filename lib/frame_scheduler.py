@@ -0,0 +1,81 @@
+from time import monotonic, sleep
+
+
+class FrameScheduler:
+    def __init__(self, step: float, throttle: bool = True, max_skip: int = 5, clock=monotonic, sleeper=sleep):
+        """
+        FrameScheduler constructor, fixed timestep loop with accumulator
+        :param step: simulation step (frame period) in seconds
+        :param throttle: sleep for the remaining budget (False runs uncapped, one step per wait)
+        :param max_skip: maximum render frames skipped in a row while falling behind
+        :param clock: monotonic clock function returning seconds
+        :param sleeper: sleep function taking seconds
+        """
+        self.step = float(step)
+        self.throttle = throttle
+        self.max_skip = int(max_skip)
+
+        self._clock = clock
+        self._sleep = sleeper
+        self._last = clock()
+        self._accumulator = 0.0
+        self._pending = 0
+        self._skipped_in_row = 0
+
+        self.deadline = self._last + self.step
+        self.steps = 0
+        self.frames = 0
+        self.skipped_frames = 0
+
+    def reset(self) -> None:
+        """
+        Restart timing, e.g. after a deliberate blocking pause
+        :return: None
+        """
+        self._last = self._clock()
+        self._accumulator = 0.0
+        self.deadline = self._last + self.step
+
+    def wait(self) -> int:
+        """
+        Sleep until the next step deadline
+        :return: number of simulation steps due as integer
+        """
+        if not self.throttle:
+            self.steps += 1
+            self._pending += 1
+            return 1
+
+        # sleep even when late, an event loop sleeper reads controller input only while sleeping
+        self._sleep(max(self.deadline - self._clock(), 0))
+        now = self._clock()
+
+        self._accumulator += now - self._last
+        self._last = now
+
+        due = int(self._accumulator // self.step)
+        self._accumulator -= due * self.step
+        self.deadline = now + self.step - self._accumulator
+        self.steps += due
+        self._pending += due
+
+        return due
+
+    def render_due(self) -> bool:
+        """
+        Check if a frame should be rendered after the simulation steps
+        (not if no step ran or the next deadline has already passed)
+        :return: bool
+        """
+        if not self._pending:
+            return False
+
+        if self.throttle and self._clock() >= self.deadline and self._skipped_in_row < self.max_skip:
+            self._skipped_in_row += 1
+            self.skipped_frames += 1
+            return False
+
+        self._pending = 0
+        self._skipped_in_row = 0
+        self.frames += 1
+        return True
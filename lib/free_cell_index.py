@@ -0,0 +1,115 @@
+from array import array
+from random import randrange
+
+
+class FreeCellIndex:
+    def __init__(self, min_x: int, max_x: int, min_y: int, max_y: int):
+        """
+        FreeCellIndex constructor, swap-remove array of free cells plus position map
+        :param min_x: minimum x integer value
+        :param max_x: maximum x integer value
+        :param min_y: minimum y integer value
+        :param max_y: maximum y integer value
+        """
+        self._min_x = int(min_x)
+        self._min_y = int(min_y)
+        self._width = int(max_x) - self._min_x + 1
+        self._height = int(max_y) - self._min_y + 1
+
+        size = self._width * self._height
+
+        # cells[:count] are free, position maps cell to its index in cells
+        self._cells = array('I', range(size))
+        self._position = array('I', range(size))
+        self._count = size
+
+    def __len__(self) -> int:
+        """
+        Get number of free cells
+        :return: count as integer
+        """
+        return self._count
+
+    def _cell(self, x: int, y: int) -> int:
+        """
+        Get cell number of a position
+        :param x: integer value for the x position
+        :param y: integer value for the y position
+        :return: cell number as integer (-1 outside of the index)
+        """
+        x -= self._min_x
+        y -= self._min_y
+
+        if 0 <= x < self._width and 0 <= y < self._height:
+            return y * self._width + x
+
+        return -1
+
+    def is_free(self, x: int, y: int) -> bool:
+        """
+        Check if a position is free
+        :param x: integer value for the x position
+        :param y: integer value for the y position
+        :return: bool
+        """
+        cell = self._cell(x, y)
+
+        return cell >= 0 and self._position[cell] < self._count
+
+    def occupy(self, x: int, y: int) -> None:
+        """
+        Remove position from free cells (ignored if outside or already occupied)
+        :param x: integer value for the x position
+        :param y: integer value for the y position
+        :return: None
+        """
+        cell = self._cell(x, y)
+        if cell < 0:
+            return
+
+        index = self._position[cell]
+        if index >= self._count:
+            return
+
+        self._count -= 1
+        last = self._cells[self._count]
+
+        self._cells[index] = last
+        self._position[last] = index
+        self._cells[self._count] = cell
+        self._position[cell] = self._count
+
+    def release(self, x: int, y: int) -> None:
+        """
+        Add position to free cells (ignored if outside or already free)
+        :param x: integer value for the x position
+        :param y: integer value for the y position
+        :return: None
+        """
+        cell = self._cell(x, y)
+        if cell < 0:
+            return
+
+        index = self._position[cell]
+        if index < self._count:
+            return
+
+        first = self._cells[self._count]
+
+        self._cells[index] = first
+        self._position[first] = index
+        self._cells[self._count] = cell
+        self._position[cell] = self._count
+        self._count += 1
+
+    def sample(self):
+        """
+        Get uniformly random free position
+        :return: tuple (x, y) or None if no cell is free
+        """
+        if not self._count:
+            return None
+
+        cell = self._cells[randrange(self._count)]
+
+        return self._min_x + cell % self._width, self._min_y + cell // self._width
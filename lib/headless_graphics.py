@@ -0,0 +1,163 @@
+from lib.bdf_font import BDFFont, load_font
+from lib.text_cache import TextCache
+
+
+# rendered strings shared by all DrawText calls
+_TEXT_CACHE = TextCache()
+
+
+class Color:
+    def __init__(self, red: int = 0, green: int = 0, blue: int = 0):
+        """
+        Color constructor
+        :param red: red value 0..255
+        :param green: green value 0..255
+        :param blue: blue value 0..255
+        """
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+
+class Font:
+    def __init__(self):
+        """
+        Font constructor
+        """
+        self._font = BDFFont()
+        self._pixels = {}
+
+    @property
+    def height(self) -> int:
+        """
+        Get font height in pixels
+        :return: height as integer
+        """
+        return self._font.height
+
+    @property
+    def baseline(self) -> int:
+        """
+        Get font baseline (ascent) in pixels
+        :return: baseline as integer
+        """
+        return self._font.baseline
+
+    @property
+    def key(self):
+        """
+        Get cache key of the loaded font, equal for all Font objects of the same file
+        :return: parsed BDFFont object
+        """
+        return self._font
+
+    def LoadFont(self, path: str) -> None:
+        """
+        Load BDF font file (parsed once per process and shared)
+        :param path: path to bdf file
+        :return: None
+        """
+        self._font = load_font(path)
+        self._pixels = {}
+
+    def CharacterWidth(self, char: int) -> int:
+        """
+        Get advance width of a character
+        :param char: unicode code point
+        :return: width as integer
+        """
+        return self._font.char_width(chr(char))
+
+    def glyph_pixels(self, char: str) -> tuple:
+        """
+        Get lit pixels and advance of a character (cached)
+        :param char: single character
+        :return: tuple (list of (x, y), advance)
+        """
+        if char not in self._pixels:
+            glyph = self._font.glyph(char)
+            self._pixels[char] = (glyph.pixels(), glyph.advance) if glyph else ([], 0)
+
+        return self._pixels[char]
+
+
+def DrawLine(canvas, x1: int, y1: int, x2: int, y2: int, color: Color) -> None:
+    """
+    Draw line with Bresenham algorithm
+    :param canvas: canvas to draw on
+    :param x1: start x coordinate
+    :param y1: start y coordinate
+    :param x2: end x coordinate
+    :param y2: end y coordinate
+    :param color: Color object
+    :return: None
+    """
+    r, g, b = color.red, color.green, color.blue
+
+    dx = abs(x2 - x1)
+    dy = -abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    error = dx + dy
+
+    while True:
+        canvas.SetPixel(x1, y1, r, g, b)
+
+        if x1 == x2 and y1 == y2:
+            break
+
+        e2 = 2 * error
+        if e2 >= dy:
+            error += dy
+            x1 += sx
+        if e2 <= dx:
+            error += dx
+            y1 += sy
+
+
+def DrawCircle(canvas, x: int, y: int, radius: int, color: Color) -> None:
+    """
+    Draw circle outline with midpoint algorithm (same as rgbmatrix)
+    :param canvas: canvas to draw on
+    :param x: center x coordinate
+    :param y: center y coordinate
+    :param radius: circle radius
+    :param color: Color object
+    :return: None
+    """
+    r, g, b = color.red, color.green, color.blue
+
+    cx = radius
+    cy = 0
+    radius_error = 1 - cx
+
+    while cy <= cx:
+        canvas.SetPixel(cx + x, cy + y, r, g, b)
+        canvas.SetPixel(cy + x, cx + y, r, g, b)
+        canvas.SetPixel(-cx + x, cy + y, r, g, b)
+        canvas.SetPixel(-cy + x, cx + y, r, g, b)
+        canvas.SetPixel(-cx + x, -cy + y, r, g, b)
+        canvas.SetPixel(-cy + x, -cx + y, r, g, b)
+        canvas.SetPixel(cx + x, -cy + y, r, g, b)
+        canvas.SetPixel(cy + x, -cx + y, r, g, b)
+
+        cy += 1
+        if radius_error < 0:
+            radius_error += 2 * cy + 1
+        else:
+            cx -= 1
+            radius_error += 2 * (cy - cx + 1)
+
+
+def DrawText(canvas, font: Font, x: int, y: int, color: Color, text: str) -> int:
+    """
+    Draw text with its baseline at y, rendered strings are cached and blitted in one copy
+    :param canvas: canvas to draw on
+    :param font: Font object
+    :param x: start x coordinate
+    :param y: baseline y coordinate
+    :param color: Color object
+    :param text: text to draw
+    :return: total advance width as integer
+    """
+    return _TEXT_CACHE.draw(canvas, font, x, y, color, text)
@@ -0,0 +1,195 @@
+from os import environ
+
+import numpy as np
+
+
+# return a new canvas object on every swap like rgbmatrix (wraps the same pixels)
+FRESH_CANVASES = environ.get('MATRIX_FRESH_CANVASES', '0') not in ('', '0')
+
+
+class RGBMatrixOptions:
+    def __init__(self):
+        """
+        RGBMatrixOptions constructor (same attributes as rgbmatrix.RGBMatrixOptions)
+        """
+        self.chain_length = 1
+        self.cols = 32
+        self.rows = 32
+        self.parallel = 1
+        self.brightness = 100
+        self.disable_hardware_pulsing = False
+        self.drop_privileges = 1
+        self.gpio_slowdown = 1
+        self.hardware_mapping = 'regular'
+        self.inverse_colors = False
+        self.led_rgb_sequence = 'RGB'
+        self.multiplexing = 0
+        self.pixel_mapper_config = ''
+        self.pwm_bits = 11
+        self.pwm_dither_bits = 0
+        self.pwm_lsb_nanoseconds = 130
+        self.row_address_type = 0
+        self.scan_mode = 0
+        self.show_refresh_rate = False
+
+
+class FrameCanvas:
+    def __init__(self, width: int, height: int, pixels: np.ndarray = None):
+        """
+        FrameCanvas constructor
+        :param width: canvas width in pixels
+        :param height: canvas height in pixels
+        :param pixels: existing pixel array to wrap (or None for a new one)
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.pixels = np.zeros((self.height, self.width, 3), dtype=np.uint8) if pixels is None else pixels
+
+    def SetPixel(self, x: int, y: int, red: int, green: int, blue: int) -> None:
+        """
+        Set single pixel color (out of range coordinates are ignored)
+        :param x: x coordinate
+        :param y: y coordinate
+        :param red: red value 0..255
+        :param green: green value 0..255
+        :param blue: blue value 0..255
+        :return: None
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y, x] = (red & 0xFF, green & 0xFF, blue & 0xFF)
+
+    def GetPixel(self, x: int, y: int) -> tuple:
+        """
+        Get single pixel color
+        :param x: x coordinate
+        :param y: y coordinate
+        :return: tuple (red, green, blue)
+        """
+        red, green, blue = self.pixels[y, x]
+
+        return int(red), int(green), int(blue)
+
+    def Clear(self) -> None:
+        """
+        Set all pixels to black
+        :return: None
+        """
+        self.pixels.fill(0)
+
+    def Fill(self, red: int, green: int, blue: int) -> None:
+        """
+        Set all pixels to one color
+        :param red: red value 0..255
+        :param green: green value 0..255
+        :param blue: blue value 0..255
+        :return: None
+        """
+        self.pixels[:, :] = (red & 0xFF, green & 0xFF, blue & 0xFF)
+
+    def SetImage(self, image, offset_x: int = 0, offset_y: int = 0, unsafe: bool = True) -> None:
+        """
+        Copy an RGB image onto the canvas (clipped at canvas edges)
+        :param image: PIL image or array of shape (height, width, 3)
+        :param offset_x: x position of the image
+        :param offset_y: y position of the image
+        :param unsafe: unused, kept for rgbmatrix compatibility
+        :return: None
+        """
+        source = np.asarray(image, dtype=np.uint8)
+        height, width = source.shape[:2]
+
+        x1, y1 = max(offset_x, 0), max(offset_y, 0)
+        x2, y2 = min(offset_x + width, self.width), min(offset_y + height, self.height)
+
+        if x1 < x2 and y1 < y2:
+            self.pixels[y1:y2, x1:x2] = source[y1 - offset_y:y2 - offset_y, x1 - offset_x:x2 - offset_x, :3]
+
+
+class RGBMatrix:
+    def __init__(self, options: RGBMatrixOptions = None, fresh_canvases: bool = FRESH_CANVASES):
+        """
+        RGBMatrix constructor, software stand-in for rgbmatrix.RGBMatrix
+        :param options: RGBMatrixOptions object
+        :param fresh_canvases: SwapOnVSync returns a new canvas object wrapping the same pixels (like rgbmatrix)
+        """
+        options = options or RGBMatrixOptions()
+
+        self.width = int(options.cols * options.chain_length)
+        self.height = int(options.rows * options.parallel)
+        self.brightness = options.brightness
+        self.luminanceCorrect = True
+        self.frame_count = 0
+        self.fresh_canvases = fresh_canvases
+
+        self._front = FrameCanvas(self.width, self.height)
+
+    @property
+    def pixels(self):
+        """
+        Get currently displayed pixels
+        :return: numpy array of shape (height, width, 3)
+        """
+        return self._front.pixels
+
+    def SetPixel(self, x: int, y: int, red: int, green: int, blue: int) -> None:
+        """
+        Set single pixel color on the displayed canvas
+        :param x: x coordinate
+        :param y: y coordinate
+        :param red: red value 0..255
+        :param green: green value 0..255
+        :param blue: blue value 0..255
+        :return: None
+        """
+        self._front.SetPixel(x, y, red, green, blue)
+
+    def Clear(self) -> None:
+        """
+        Set all pixels of the displayed canvas to black
+        :return: None
+        """
+        self._front.Clear()
+
+    def Fill(self, red: int, green: int, blue: int) -> None:
+        """
+        Set all pixels of the displayed canvas to one color
+        :param red: red value 0..255
+        :param green: green value 0..255
+        :param blue: blue value 0..255
+        :return: None
+        """
+        self._front.Fill(red, green, blue)
+
+    def SetImage(self, image, offset_x: int = 0, offset_y: int = 0, unsafe: bool = True) -> None:
+        """
+        Copy an RGB image onto the displayed canvas
+        :param image: PIL image or array of shape (height, width, 3)
+        :param offset_x: x position of the image
+        :param offset_y: y position of the image
+        :param unsafe: unused, kept for rgbmatrix compatibility
+        :return: None
+        """
+        self._front.SetImage(image, offset_x, offset_y, unsafe)
+
+    def CreateFrameCanvas(self) -> FrameCanvas:
+        """
+        Create a new offscreen canvas
+        :return: FrameCanvas object
+        """
+        return FrameCanvas(self.width, self.height)
+
+    def SwapOnVSync(self, canvas: FrameCanvas, framerate_fraction: int = 1) -> FrameCanvas:
+        """
+        Display canvas and return the previously displayed one (never waits)
+        :param canvas: canvas to display
+        :param framerate_fraction: unused, kept for rgbmatrix compatibility
+        :return: previously displayed canvas
+        """
+        previous = self._front
+        self._front = canvas
+        self.frame_count += 1
+
+        if self.fresh_canvases:
+            return FrameCanvas(previous.width, previous.height, pixels=previous.pixels)
+
+        return previous
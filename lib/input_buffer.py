@@ -0,0 +1,81 @@
+from collections import deque
+from time import time_ns
+
+
+class InputBuffer:
+    def __init__(self, profiler=None, source=None, clock=time_ns):
+        """
+        InputBuffer constructor, queues timestamped input events and hands them out once per simulation step
+        :param profiler: FrameProfiler object recording the input to photon latency (or None)
+        :param source: function returning new events for a simulation step number, e.g. scripted input (or None)
+        :param clock: wall clock function returning nanoseconds (same clock as the evdev event timestamps)
+        """
+        self._queue = deque()
+        self._source = source
+        self._clock = clock
+        self._unpresented = []
+        self._histogram = profiler.histogram('input_lag') if profiler and profiler.enabled else None
+
+    def __call__(self, step: int) -> list:
+        """
+        Get snapshot of all events queued before this step, in arrival order
+        :param step: simulation step number (unused, same signature as scripted input)
+        :return: list of input events
+        """
+        if self._source:
+            self._queue.extend(self._source(step))
+
+        return self.snapshot()
+
+    def push(self, event) -> None:
+        """
+        Queue an input event
+        :param event: evdev input event with sec and usec kernel timestamp
+        :return: None
+        """
+        self._queue.append(event)
+
+    def extend(self, events) -> None:
+        """
+        Queue several input events
+        :param events: iterable of evdev input events
+        :return: None
+        """
+        self._queue.extend(events)
+
+    def snapshot(self) -> list:
+        """
+        Take all queued events, later events go to the next snapshot
+        :return: list of input events
+        """
+        events = list(self._queue)
+        self._queue.clear()
+
+        if self._histogram is not None:
+            self._unpresented.extend(event.sec * 1000000000 + event.usec * 1000 for event in events)
+
+        return events
+
+    def on_shown(self):
+        """
+        Take the events applied since the last call, their frame is about to be swapped
+        :return: function recording their input to photon latency when the frame is displayed (or None)
+        """
+        if not self._unpresented:
+            return None
+
+        timestamps = self._unpresented
+        self._unpresented = []
+
+        def shown(now: int = None) -> None:
+            """
+            Record latency of the events of the displayed frame
+            :param now: display time in nanoseconds of the wall clock (or None for the current time)
+            :return: None
+            """
+            now = self._clock() if now is None else now
+
+            for timestamp in timestamps:
+                self._histogram.record(max(now - timestamp, 0))
+
+        return shown
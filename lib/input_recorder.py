@@ -0,0 +1,211 @@
+from asyncio import sleep as async_sleep
+from struct import Struct
+from time import time_ns, sleep
+
+from evdev import InputEvent, ecodes
+
+
+MAGIC = b'EVR1'
+
+# microseconds since previous event, type, code, value
+RECORD = Struct('<IHHi')
+
+
+def _stamp() -> tuple:
+    """
+    Get current wall clock time as evdev timestamp
+    :return: tuple (sec, usec)
+    """
+    sec, nsec = divmod(time_ns(), 1000000000)
+
+    return sec, nsec // 1000
+
+
+class InputRecorder:
+    def __init__(self, path: str, include_sync: bool = False):
+        """
+        InputRecorder constructor, writes events as fixed size binary records
+        :param path: recording file path
+        :param include_sync: also record EV_SYN events
+        """
+        self.include_sync = include_sync
+        self.count = 0
+
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._last = None
+
+    def record(self, event) -> None:
+        """
+        Append an event, its timestamp is stored relative to the previous event
+        :param event: evdev input event
+        :return: None
+        """
+        if event.type == ecodes.EV_SYN and not self.include_sync:
+            return
+
+        timestamp = event.sec * 1000000 + event.usec
+        delta = 0 if self._last is None else min(max(timestamp - self._last, 0), 0xFFFFFFFF)
+        self._last = timestamp
+
+        self._file.write(RECORD.pack(delta, event.type, event.code, event.value))
+        self.count += 1
+
+    def record_device(self, device, limit: int = None) -> None:
+        """
+        Record events of a device until limit is reached (or forever)
+        :param device: evdev device with read_loop()
+        :param limit: number of events to record (or None)
+        :return: None
+        """
+        for event in device.read_loop():
+            self.record(event)
+
+            if limit and self.count >= limit:
+                break
+
+    def close(self) -> None:
+        """
+        Flush and close the recording file
+        :return: None
+        """
+        self._file.close()
+
+
+def load_recording(path: str) -> list:
+    """
+    Read a recording file
+    :param path: recording file path
+    :return: list of (offset in microseconds from first event, type, code, value) tuples
+    """
+    with open(path, 'rb') as recording:
+        data = recording.read()
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f'{path} is not an input recording')
+
+    records = []
+    offset = 0
+
+    for delta, event_type, code, value in RECORD.iter_unpack(data[len(MAGIC):]):
+        offset += delta
+        records.append((offset, event_type, code, value))
+
+    return records
+
+
+class ReplayDevice:
+    def __init__(self, path: str, realtime: bool = True, repeat: bool = False):
+        """
+        ReplayDevice constructor, plays a recording back like an evdev device
+        :param path: recording file path
+        :param realtime: keep original timing (False replays as fast as possible)
+        :param repeat: start again at the end of the recording
+        """
+        self.path = path
+        self.name = f'Replay {path}'
+        self.realtime = realtime
+        self.repeat = repeat
+        self.records = load_recording(path)
+
+        # duration of one pass, repeated passes are spaced by one millisecond
+        self.duration = self.records[-1][0] + 1000 if self.records else 0
+
+    def _passes(self):
+        """
+        Iterate over the records, once or forever
+        :return: generator of (offset, type, code, value) tuples with offsets growing over passes
+        """
+        start = 0
+
+        while self.records:
+            for offset, event_type, code, value in self.records:
+                yield start + offset, event_type, code, value
+
+            if not self.repeat:
+                break
+            start += self.duration
+
+    def read_loop(self):
+        """
+        Yield recorded events, stamped with the wall clock time of the replay
+        :return: generator of InputEvent objects
+        """
+        start = time_ns() // 1000
+
+        for offset, event_type, code, value in self._passes():
+            if self.realtime:
+                delay = start + offset - time_ns() // 1000
+                if delay > 0:
+                    sleep(delay / 1e6)
+
+            yield InputEvent(*_stamp(), event_type, code, value)
+
+    async def async_read_loop(self):
+        """
+        Yield recorded events on an asyncio event loop, stamped with the wall clock time of the replay
+        :return: async generator of InputEvent objects
+        """
+        start = time_ns() // 1000
+
+        for offset, event_type, code, value in self._passes():
+            delay = start + offset - time_ns() // 1000 if self.realtime else 0
+            await async_sleep(max(delay, 0) / 1e6)
+
+            yield InputEvent(*_stamp(), event_type, code, value)
+
+    def step_source(self, step_seconds: float):
+        """
+        Create scripted input which maps the recording onto simulation steps, independent of wall clock time
+        (each call is the next step, so the recording continues over game restarts)
+        :param step_seconds: simulation step in seconds
+        :return: function returning the events of a simulation step
+        """
+        step_us = int(step_seconds * 1e6)
+        records = self._passes()
+        pending = next(records, None)
+        end = 0
+
+        def events(step: int) -> list:
+            nonlocal pending, end
+            result = []
+            end += step_us
+
+            while pending and pending[0] < end:
+                result.append(InputEvent(*_stamp(), *pending[1:]))
+                pending = next(records, None)
+
+            return result
+
+        return events
+
+    def close(self) -> None:
+        """
+        Close the device (nothing to release, same interface as evdev devices)
+        :return: None
+        """
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from signal import signal, SIGINT
+
+    from lib.terminate_application import signal_handler
+    from lib.stadia_controller import gamepad
+
+    parser = ArgumentParser(description='Record controller events into a binary file')
+    parser.add_argument('output', help='recording file')
+    parser.add_argument('--limit', type=int, help='stop after number of events')
+    parser.add_argument('--sync', action='store_true', help='also record EV_SYN events')
+    args = parser.parse_args()
+
+    recorder = InputRecorder(args.output, include_sync=args.sync)
+
+    def stop(interrupt_signal, frame) -> None:
+        recorder.close()
+        signal_handler(interrupt_signal, frame)
+
+    signal(SIGINT, stop)
+
+    recorder.record_device(gamepad, limit=args.limit)
+    recorder.close()
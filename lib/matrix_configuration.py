@@ -1,23 +1,38 @@
-from rgbmatrix import RGBMatrixOptions
-
-
-options = RGBMatrixOptions()
-options.chain_length = 1
-options.cols = 64
-options.rows = 32
-options.parallel = 1
-options.brightness = 50
-options.disable_hardware_pulsing = True
-options.drop_privileges = 1
-options.gpio_slowdown = 1
-options.hardware_mapping = 'adafruit-hat'
-options.inverse_colors = False
-options.led_rgb_sequence = "RGB"
-options.multiplexing = 0
-options.pixel_mapper_config = ''
-options.pwm_bits = 11
-options.pwm_dither_bits = 0
-options.pwm_lsb_nanoseconds = 130
-options.row_address_type = 0
-options.scan_mode = 0
-options.show_refresh_rate = False
+from os import environ
+
+from lib.matrix_profile import load_profile
+from lib.screen_layout import get_layout
+
+
+# display backend: 'rgbmatrix' (hardware) or 'headless' (numpy framebuffer)
+BACKEND = environ.get('MATRIX_BACKEND', 'rgbmatrix')
+
+if BACKEND == 'headless':
+    from lib.headless_matrix import RGBMatrixOptions, RGBMatrix
+else:
+    from rgbmatrix import RGBMatrixOptions, RGBMatrix
+
+
+def create_options(profile: dict) -> RGBMatrixOptions:
+    """
+    Create matrix options from a profile (unknown option names raise an AttributeError on the hardware backend)
+    :param profile: dict with 'options'
+    :return: RGBMatrixOptions object
+    """
+    matrix_options = RGBMatrixOptions()
+
+    for key, value in profile['options'].items():
+        setattr(matrix_options, key, value)
+
+    return matrix_options
+
+
+# options of the profile selected by MATRIX_PROFILE (default: profiles/default.json)
+profile = load_profile()
+options = create_options(profile)
+
+# panel refresh period measured by tune_matrix.py (or None for untuned profiles)
+vsync_period = 1.0 / profile['tuning']['refresh_hz'] if 'tuning' in profile else None
+
+# screen geometry of the configuration, games read it instead of options.cols / options.rows
+layout = get_layout(options)
@@ -0,0 +1,45 @@
+from json import dump, load
+from os import environ, path
+
+
+# named option profile in PROFILE_DIRECTORY (or path of a json file)
+PROFILE = environ.get('MATRIX_PROFILE', 'default')
+PROFILE_DIRECTORY = path.join(path.dirname(path.dirname(path.abspath(__file__))), 'profiles')
+
+
+def profile_path(name: str) -> str:
+    """
+    Get file path of a profile
+    :param name: profile name (or path of a json file)
+    :return: path as string
+    """
+    if name.endswith('.json'):
+        return name
+
+    return path.join(PROFILE_DIRECTORY, f'{name}.json')
+
+
+def load_profile(name: str = PROFILE) -> dict:
+    """
+    Read a profile file
+    :param name: profile name (or path of a json file)
+    :return: dict with 'options' (and optional 'tuning' results)
+    """
+    with open(profile_path(name)) as profile_file:
+        return load(profile_file)
+
+
+def save_profile(name: str, profile: dict) -> str:
+    """
+    Write a profile file
+    :param name: profile name (or path of a json file)
+    :param profile: dict with 'options' (and optional 'tuning' results)
+    :return: path of the written file
+    """
+    file_path = profile_path(name)
+
+    with open(file_path, 'w') as profile_file:
+        dump(profile, profile_file, indent=2)
+        profile_file.write('\n')
+
+    return file_path
@@ -0,0 +1,162 @@
+import numpy as np
+
+
+PALETTE_SIZE = 256
+
+
+class Palette:
+    def __init__(self, gamma: float = 1.0, brightness: int = 100):
+        """
+        Palette constructor, up to 256 indexed colors with precomputed gamma and brightness LUT
+        (index 0 is black, hardware rgbmatrix applies its own luminance correction, so default gamma is 1.0)
+        :param gamma: gamma exponent of the channel LUT
+        :param brightness: software brightness in percent (on top of options.brightness)
+        """
+        self.colors = np.zeros((PALETTE_SIZE, 3), dtype=np.uint8)
+        self.lut = np.zeros((PALETTE_SIZE, 3), dtype=np.uint8)
+        self.gamma = float(gamma)
+        self.brightness = int(brightness)
+        self.fade = 1.0
+        self.version = 0
+
+        self._indices = {(0, 0, 0): 0}
+        self._channel = np.arange(256, dtype=np.uint8)
+
+        self._update()
+
+    def __len__(self) -> int:
+        """
+        Get number of used palette entries
+        :return: count as integer
+        """
+        return len(self._indices)
+
+    def _update(self) -> None:
+        """
+        Rebuild channel LUT and color LUT, presenters compare the version to detect the swap
+        :return: None
+        """
+        level = 255.0 * self.brightness / 100 * self.fade
+        channel = level * (np.arange(256) / 255.0) ** self.gamma
+        self._channel = np.clip(np.rint(channel), 0, 255).astype(np.uint8)
+
+        np.take(self._channel, self.colors, out=self.lut)
+        self.version += 1
+
+    def index(self, red: int, green: int, blue: int) -> int:
+        """
+        Get palette index of a color, new colors get the next free index
+        :param red: red value 0..255
+        :param green: green value 0..255
+        :param blue: blue value 0..255
+        :return: index as integer
+        """
+        key = (red, green, blue)
+        index = self._indices.get(key)
+
+        if index is None:
+            index = len(self._indices)
+            if index >= PALETTE_SIZE:
+                raise ValueError(f'palette is full, cannot add color {key}')
+
+            self._indices[key] = index
+            self.colors[index] = key
+            self.lut[index] = self._channel[list(key)]
+
+        return index
+
+    def set_gamma(self, gamma: float) -> None:
+        """
+        Change gamma exponent
+        :param gamma: gamma exponent
+        :return: None
+        """
+        self.gamma = float(gamma)
+        self._update()
+
+    def set_brightness(self, brightness: int) -> None:
+        """
+        Change software brightness, e.g. for day/night dimming
+        :param brightness: brightness in percent
+        :return: None
+        """
+        self.brightness = int(brightness)
+        self._update()
+
+    def set_fade(self, fade: float) -> None:
+        """
+        Change fade level, used by fade effects
+        :param fade: level 0.0 (black) .. 1.0 (full)
+        :return: None
+        """
+        fade = min(max(float(fade), 0.0), 1.0)
+
+        if fade != self.fade:
+            self.fade = fade
+            self._update()
+
+    def convert(self, indices: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Convert palette indices to RGB in one LUT pass
+        :param indices: array of palette indices
+        :param out: RGB array of shape indices.shape + (3,) (or None)
+        :return: RGB array
+        """
+        return np.take(self.lut, indices, axis=0, out=out)
+
+
+# global palette shared by all renderers, e.g. PALETTE.set_brightness(30) dims every game
+PALETTE = Palette()
+
+
+class IndexedCanvas:
+    def __init__(self, width: int, height: int, palette: Palette):
+        """
+        IndexedCanvas constructor, software frame of palette indices (one byte per pixel)
+        :param width: canvas width in pixels
+        :param height: canvas height in pixels
+        :param palette: Palette object
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.palette = palette
+        self.indices = np.zeros((self.height, self.width), dtype=np.uint8)
+
+    def SetPixel(self, x: int, y: int, red: int, green: int, blue: int) -> None:
+        """
+        Set single pixel (ignored outside of the canvas)
+        :param x: x position
+        :param y: y position
+        :param red: red value 0..255
+        :param green: green value 0..255
+        :param blue: blue value 0..255
+        :return: None
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.indices[y, x] = self.palette.index(red, green, blue)
+
+    def GetPixel(self, x: int, y: int) -> tuple:
+        """
+        Get color of a single pixel
+        :param x: x position
+        :param y: y position
+        :return: tuple (red, green, blue)
+        """
+        return tuple(self.palette.colors[self.indices[y, x]].tolist())
+
+    def Clear(self) -> None:
+        """
+        Set all pixels to black
+        :return: None
+        """
+        self.indices.fill(0)
+
+    def Fill(self, red: int, green: int, blue: int) -> None:
+        """
+        Set all pixels to a color
+        :param red: red value 0..255
+        :param green: green value 0..255
+        :param blue: blue value 0..255
+        :return: None
+        """
+        self.indices.fill(self.palette.index(red, green, blue))
@@ -0,0 +1,140 @@
+import numpy as np
+
+from lib.collision_helper import collide_points_rectangles
+
+
+class ProjectilePool:
+    def __init__(self, capacity: int):
+        """
+        ProjectilePool constructor, preallocated projectile arrays with active bitmap
+        :param capacity: maximum number of projectiles in flight
+        """
+        self.capacity = int(capacity)
+
+        # positions as (x, y) rows, x and y are column views
+        self.points = np.zeros((self.capacity, 2), dtype=np.int32)
+        self.x = self.points[:, 0]
+        self.y = self.points[:, 1]
+        self.dx = np.zeros(self.capacity, dtype=np.int32)
+        self.dy = np.zeros(self.capacity, dtype=np.int32)
+        self.active = np.zeros(self.capacity, dtype=bool)
+
+        # scratch buffers and unsigned views, advance() and hit() allocate no per projectile arrays
+        self._outside = np.zeros(self.capacity, dtype=bool)
+        self._buffer = np.zeros(self.capacity, dtype=bool)
+        self._x_unsigned = self.x.view(np.uint32)
+        self._y_unsigned = self.y.view(np.uint32)
+        self._rectangle = np.zeros((1, 4), dtype=np.int32)
+        self._hits = np.zeros((self.capacity, 1), dtype=bool)
+        self._hit = self._hits[:, 0]
+        self._active_rows = self.active[:, None]
+
+    def __len__(self) -> int:
+        """
+        Get number of projectiles in flight
+        :return: count as integer
+        """
+        return int(np.count_nonzero(self.active))
+
+    def fire(self, x: int, y: int, dx: int, dy: int) -> int:
+        """
+        Activate a free projectile slot
+        :param x: start x position
+        :param y: start y position
+        :param dx: x speed per step
+        :param dy: y speed per step
+        :return: slot as integer (-1 if pool is exhausted)
+        """
+        slot = int(np.argmin(self.active))
+
+        if self.active[slot]:
+            return -1
+
+        self.x[slot] = x
+        self.y[slot] = y
+        self.dx[slot] = dx
+        self.dy[slot] = dy
+        self.active[slot] = True
+
+        return slot
+
+    def retire(self, slot: int) -> None:
+        """
+        Deactivate a projectile
+        :param slot: projectile slot
+        :return: None
+        """
+        self.active[slot] = False
+
+    def clear(self) -> None:
+        """
+        Deactivate all projectiles
+        :return: None
+        """
+        self.active.fill(False)
+
+    def advance(self, width: int, height: int) -> None:
+        """
+        Move all projectiles one step and retire those leaving the panel
+        :param width: panel width
+        :param height: panel height
+        :return: None
+        """
+        outside = self._outside
+        buffer = self._buffer
+
+        np.add(self.x, self.dx, out=self.x)
+        np.add(self.y, self.dy, out=self.y)
+
+        # negative positions wrap to large unsigned values
+        np.greater_equal(self._x_unsigned, width, out=outside)
+        np.greater_equal(self._y_unsigned, height, out=buffer)
+        np.logical_or(outside, buffer, out=outside)
+
+        # active and not outside
+        np.greater(self.active, outside, out=self.active)
+
+    def bounds(self) -> tuple:
+        """
+        Get bounding box of the projectiles in flight
+        :return: tuple (x, y, width, height) or None if no projectile is in flight
+        """
+        if not self.active.any():
+            return None
+
+        x1, y1 = self.points.min(axis=0, where=self._active_rows, initial=np.iinfo(np.int32).max).tolist()
+        x2, y2 = self.points.max(axis=0, where=self._active_rows, initial=np.iinfo(np.int32).min).tolist()
+
+        return x1, y1, x2 - x1, y2 - y1
+
+    def hit(self, x: int, y: int, width: int, height: int) -> int:
+        """
+        Retire all projectiles inside a rectangle in one batch test
+        :param x: rectangle x position
+        :param y: rectangle y position
+        :param width: rectangle width
+        :param height: rectangle height
+        :return: number of retired projectiles as integer
+        """
+        rectangle = self._rectangle
+        rectangle[0, 0] = x
+        rectangle[0, 1] = y
+        rectangle[0, 2] = width
+        rectangle[0, 3] = height
+
+        collide_points_rectangles(self.points, rectangle, out=self._hits)
+        np.logical_and(self._hit, self.active, out=self._hit)
+
+        hits = int(np.count_nonzero(self._hit))
+        if hits:
+            # active and not hit
+            np.greater(self.active, self._hit, out=self.active)
+
+        return hits
+
+    def slots(self) -> list:
+        """
+        Get active projectile slots
+        :return: list of slot integers
+        """
+        return np.flatnonzero(self.active).tolist()
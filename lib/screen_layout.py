@@ -0,0 +1,71 @@
+from functools import lru_cache
+
+
+# geometry the games were designed for (single 64x32 panel)
+BASE_WIDTH = 64
+BASE_HEIGHT = 32
+
+
+class Layout:
+    def __init__(self, width: int, height: int):
+        """
+        Layout constructor, screen geometry derived once from the panel configuration
+        :param width: screen width in pixels (all chained panels)
+        :param height: screen height in pixels (all parallel chains)
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.right = self.width - 1
+        self.bottom = self.height - 1
+        self.center_x = self.width // 2
+        self.center_y = self.height // 2
+
+        # continuous factors for positions, integer factor for pixel art (sprites, fonts, line widths)
+        self.scale_x = self.width / BASE_WIDTH
+        self.scale_y = self.height / BASE_HEIGHT
+        self.scale = max(min(self.width // BASE_WIDTH, self.height // BASE_HEIGHT), 1)
+
+    def x(self, base_x: int) -> int:
+        """
+        Scale a horizontal position of the 64x32 design
+        :param base_x: x position on the base geometry
+        :return: x position as integer
+        """
+        return int(base_x * self.scale_x)
+
+    def y(self, base_y: int) -> int:
+        """
+        Scale a vertical position of the 64x32 design
+        :param base_y: y position on the base geometry
+        :return: y position as integer
+        """
+        return int(base_y * self.scale_y)
+
+    def anchor(self, base_x: int, base_y: int) -> tuple:
+        """
+        Move a position of the 64x32 design relative to the screen center, e.g. unscaled HUD text stays centered
+        :param base_x: x position on the base geometry
+        :param base_y: y position on the base geometry
+        :return: tuple (x, y)
+        """
+        return self.center_x + base_x - BASE_WIDTH // 2, self.center_y + base_y - BASE_HEIGHT // 2
+
+
+@lru_cache(maxsize=None)
+def _layout(width: int, height: int) -> Layout:
+    """
+    Create the layout of a screen size once
+    :param width: screen width in pixels
+    :param height: screen height in pixels
+    :return: Layout object
+    """
+    return Layout(width, height)
+
+
+def get_layout(options) -> Layout:
+    """
+    Get the cached layout of a panel configuration (chained panels extend the width, parallel chains the height)
+    :param options: RGBMatrixOptions object
+    :return: Layout object
+    """
+    return _layout(int(options.cols * options.chain_length), int(options.rows * options.parallel))
@@ -0,0 +1,138 @@
+from itertools import combinations
+
+
+class SpatialHash:
+    def __init__(self, width: int, height: int, cell_size: int = 8):
+        """
+        SpatialHash constructor, uniform grid broad-phase sized to the panel
+        :param width: panel width in pixels
+        :param height: panel height in pixels
+        :param cell_size: cell width and height in pixels
+        """
+        self.cell_size = int(cell_size)
+        self.cols = -(-int(width) // self.cell_size)
+        self.rows = -(-int(height) // self.cell_size)
+
+        self._cells = [set() for _ in range(self.cols * self.rows)]
+        self._ranges = {}
+        self._serials = {}
+        self._next_serial = 0
+
+    def __len__(self) -> int:
+        """
+        Get number of entities
+        :return: count as integer
+        """
+        return len(self._ranges)
+
+    def __contains__(self, key) -> bool:
+        """
+        Check if entity is in the hash
+        :param key: entity key
+        :return: bool
+        """
+        return key in self._ranges
+
+    def _cell_range(self, x: int, y: int, width: int, height: int) -> tuple:
+        """
+        Get clamped cell range of a box (right and bottom edge inclusive)
+        :param x: box x position
+        :param y: box y position
+        :param width: box width
+        :param height: box height
+        :return: tuple (col1, row1, col2, row2), empty if col1 > col2 or row1 > row2
+        """
+        size = self.cell_size
+
+        return (max(int(x) // size, 0),
+                max(int(y) // size, 0),
+                min(int(x + width) // size, self.cols - 1),
+                min(int(y + height) // size, self.rows - 1))
+
+    def _add(self, key, cell_range: tuple) -> None:
+        """
+        Add key to all cells of a range
+        :param key: entity key
+        :param cell_range: tuple (col1, row1, col2, row2)
+        :return: None
+        """
+        col1, row1, col2, row2 = cell_range
+
+        for row in range(row1, row2 + 1):
+            for col in range(col1, col2 + 1):
+                self._cells[row * self.cols + col].add(key)
+
+    def _discard(self, key, cell_range: tuple) -> None:
+        """
+        Remove key from all cells of a range
+        :param key: entity key
+        :param cell_range: tuple (col1, row1, col2, row2)
+        :return: None
+        """
+        col1, row1, col2, row2 = cell_range
+
+        for row in range(row1, row2 + 1):
+            for col in range(col1, col2 + 1):
+                self._cells[row * self.cols + col].discard(key)
+
+    def insert(self, key, x: int, y: int, width: int = 0, height: int = 0) -> None:
+        """
+        Insert entity with its bounding box
+        :param key: hashable entity key
+        :param x: box x position
+        :param y: box y position
+        :param width: box width
+        :param height: box height
+        :return: None
+        """
+        if key in self._ranges:
+            self.move(key, x, y, width, height)
+            return
+
+        cell_range = self._cell_range(x, y, width, height)
+        self._ranges[key] = cell_range
+        self._serials[key] = self._next_serial
+        self._next_serial += 1
+        self._add(key, cell_range)
+
+    def move(self, key, x: int, y: int, width: int = 0, height: int = 0) -> None:
+        """
+        Move entity, cells are only updated when its cell range changes
+        :param key: hashable entity key
+        :param x: box x position
+        :param y: box y position
+        :param width: box width
+        :param height: box height
+        :return: None
+        """
+        cell_range = self._cell_range(x, y, width, height)
+        previous = self._ranges[key]
+
+        if cell_range != previous:
+            self._discard(key, previous)
+            self._add(key, cell_range)
+            self._ranges[key] = cell_range
+
+    def remove(self, key) -> None:
+        """
+        Remove entity
+        :param key: hashable entity key
+        :return: None
+        """
+        self._discard(key, self._ranges.pop(key))
+        del self._serials[key]
+
+    def pairs(self) -> set:
+        """
+        Get candidate pairs of entities sharing at least one cell
+        :return: set of (key a, key b) tuples, a inserted before b
+        """
+        serials = self._serials
+        result = set()
+
+        for cell in self._cells:
+            if len(cell) > 1:
+                for a, b in combinations(sorted(cell, key=serials.__getitem__), 2):
+                    result.add((a, b))
+
+        return result
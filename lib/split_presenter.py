@@ -0,0 +1,321 @@
+from collections import deque
+from multiprocessing import Event, Process, parent_process
+from multiprocessing.shared_memory import SharedMemory
+from os import environ
+from signal import signal, SIGINT, SIG_IGN
+from time import time_ns
+
+import numpy as np
+
+from lib.headless_matrix import FrameCanvas
+from lib.frame_presenter import BUFFERS
+
+
+# run the matrix in a separate presenter process, the game process only simulates and draws
+SPLIT = environ.get('FRAME_SPLIT', '0') not in ('', '0')
+
+# header of int64 values: sequence of slot 0 and slot 1, then the counters written by the presenter process
+HEADER = 7
+SLOTS = 2
+
+# frames shown, missed vsyncs, tearing frames, number of the last displayed frame and its wall clock time (ns)
+SHOWN = 2
+MISSED_VSYNCS = 3
+TEARING_FRAMES = 4
+SHOWN_FRAME = 5
+SHOWN_TIME = 6
+
+
+class SharedFramebuffer:
+    def __init__(self, width: int, height: int, name: str = None):
+        """
+        SharedFramebuffer constructor, double buffered RGB frames in shared memory with sequence numbers
+        (odd sequence: slot is written, even sequence: twice the number of the complete frame)
+        :param width: frame width in pixels
+        :param height: frame height in pixels
+        :param name: name of an existing block to attach to (or None to create one)
+        """
+        self.width = int(width)
+        self.height = int(height)
+
+        frame_size = self.height * self.width * 3
+        header_size = HEADER * 8
+
+        self._memory = SharedMemory(name=name, create=name is None, size=header_size + SLOTS * frame_size)
+        self._owner = name is None
+        self.name = self._memory.name
+
+        self.header = np.ndarray((HEADER,), dtype=np.int64, buffer=self._memory.buf)
+        self.slots = [np.ndarray((self.height, self.width, 3), dtype=np.uint8, buffer=self._memory.buf,
+                                 offset=header_size + slot * frame_size) for slot in range(SLOTS)]
+
+        if self._owner:
+            self.header.fill(0)
+
+    def newest(self) -> int:
+        """
+        Get the slot of the newest complete frame
+        :return: slot as integer (or -1 if no frame is complete)
+        """
+        sequences = [int(sequence) if not sequence & 1 else 0 for sequence in self.header[:SLOTS]]
+        newest = max(range(SLOTS), key=sequences.__getitem__)
+
+        return newest if sequences[newest] else -1
+
+    def read(self, out: np.ndarray) -> int:
+        """
+        Copy the newest complete frame without locking, a copy overtaken by the writer is repeated once
+        :param out: array of shape (height, width, 3)
+        :return: sequence of the copied frame (or 0 if no complete frame could be copied)
+        """
+        for _ in range(2):
+            slot = self.newest()
+            if slot < 0:
+                return 0
+
+            # the writer may have started the slot again since newest() looked at it
+            sequence = int(self.header[slot])
+            if sequence & 1:
+                continue
+
+            np.copyto(out, self.slots[slot])
+
+            if int(self.header[slot]) == sequence:
+                return sequence
+
+        return 0
+
+    def close(self) -> None:
+        """
+        Detach from the shared memory, the creating side also removes the block
+        :return: None
+        """
+        # views must be released before the memory can be closed
+        self.header = None
+        self.slots = []
+        self._memory.close()
+
+        if self._owner:
+            self._memory.unlink()
+
+
+class SharedCanvas(FrameCanvas):
+    def __init__(self, pixels: np.ndarray):
+        """
+        SharedCanvas constructor, frame canvas drawing directly into a shared memory slot
+        :param pixels: slot array of shape (height, width, 3)
+        """
+        super().__init__(pixels.shape[1], pixels.shape[0], pixels=pixels)
+
+
+def _shown_callback(header: np.ndarray, number: int):
+    """
+    Create the callback publishing a displayed frame to the game process
+    :param header: shared header array
+    :param number: frame number
+    :return: function called right after SwapOnVSync returned
+    """
+    def shown() -> None:
+        """
+        Publish display time and number of the frame (time first, the game process reads the number first)
+        :return: None
+        """
+        header[SHOWN_TIME] = time_ns()
+        header[SHOWN_FRAME] = number
+
+    return shown
+
+
+def _present_loop(name: str, width: int, height: int, buffers: int, framerate_fraction: int, ready, stop) -> None:
+    """
+    Presenter process: show the newest complete frame on the matrix on every new frame
+    :param name: shared memory name
+    :param width: frame width in pixels
+    :param height: frame height in pixels
+    :param buffers: number of canvases in rotation
+    :param framerate_fraction: show each frame for n refresh cycles
+    :param ready: event set by the game process after a frame is complete
+    :param stop: event set by the game process to end the loop
+    :return: None
+    """
+    # the game process handles CTRL + c and stops this process
+    signal(SIGINT, SIG_IGN)
+
+    from lib.matrix_configuration import options, vsync_period, RGBMatrix
+    from lib.frame_presenter import FramePresenter, push_frame
+
+    framebuffer = SharedFramebuffer(width, height, name=name)
+    presenter = FramePresenter(matrix=RGBMatrix(options=options), buffers=buffers,
+                               framerate_fraction=framerate_fraction, vsync_period=vsync_period)
+    header = framebuffer.header
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    previous = {}
+    shown = 0
+    parent = parent_process()
+
+    while not stop.is_set():
+        if not ready.wait(timeout=.1):
+            # a killed game process cannot set the stop event
+            if not parent.is_alive():
+                break
+            continue
+        ready.clear()
+
+        sequence = framebuffer.read(out=frame)
+        if sequence <= shown:
+            continue
+        shown = sequence
+
+        # keyed by pool slot, rgbmatrix returns a new canvas object on every swap
+        previous[presenter.slot] = push_frame(presenter.canvas, frame, previous.get(presenter.slot))
+        presenter.swap(shown=_shown_callback(header, sequence // 2))
+
+        header[SHOWN] += 1
+        header[MISSED_VSYNCS] = presenter.missed_vsyncs
+        header[TEARING_FRAMES] = presenter.tearing_frames
+
+    presenter.close()
+    header = None
+    framebuffer.close()
+
+
+class SplitPresenter:
+    def __init__(self, width: int, height: int, buffers: int = BUFFERS, framerate_fraction: int = 1):
+        """
+        SplitPresenter constructor, same interface as FramePresenter for the game process,
+        the matrix is created and refreshed in a presenter process
+        :param width: frame width in pixels
+        :param height: frame height in pixels
+        :param buffers: number of matrix canvases in rotation of the presenter process (default FRAME_BUFFERS)
+        :param framerate_fraction: show each frame for n refresh cycles (SwapOnVSync argument)
+        """
+        self.framebuffer = SharedFramebuffer(width, height)
+        self.canvases = [SharedCanvas(slot) for slot in self.framebuffer.slots]
+        self.frames = 0
+
+        # (frame number, shown callback) of frames not yet displayed by the presenter process
+        self._unshown = deque()
+
+        self._ready = Event()
+        self._stop = Event()
+        self._process = Process(target=_present_loop,
+                                args=(self.framebuffer.name, width, height, buffers, framerate_fraction,
+                                      self._ready, self._stop),
+                                daemon=True)
+        self._process.start()
+
+        self._slot = 0
+        self._begin()
+
+    @property
+    def canvas(self) -> SharedCanvas:
+        """
+        Get the canvas of the slot currently written by the game
+        :return: SharedCanvas object
+        """
+        return self.canvases[self._slot]
+
+    @property
+    def slot(self) -> int:
+        """
+        Get the slot currently written by the game
+        :return: slot as integer
+        """
+        return self._slot
+
+    @property
+    def shown(self) -> int:
+        """
+        Get number of frames shown by the presenter process
+        :return: count as integer
+        """
+        return int(self.framebuffer.header[SHOWN])
+
+    @property
+    def missed_vsyncs(self) -> int:
+        """
+        Get number of missed vsyncs counted by the presenter process
+        :return: count as integer
+        """
+        return int(self.framebuffer.header[MISSED_VSYNCS])
+
+    @property
+    def tearing_frames(self) -> int:
+        """
+        Get number of tearing-prone frames counted by the presenter process
+        :return: count as integer
+        """
+        return int(self.framebuffer.header[TEARING_FRAMES])
+
+    def _report_shown(self) -> None:
+        """
+        Call the shown callbacks of all frames up to the last displayed one with its display time,
+        frames overtaken by a newer one count as displayed with it
+        :return: None
+        """
+        header = self.framebuffer.header
+        number = int(header[SHOWN_FRAME])
+        now = int(header[SHOWN_TIME])
+
+        while self._unshown and self._unshown[0][0] <= number:
+            self._unshown.popleft()[1](now)
+
+    def _begin(self) -> None:
+        """
+        Mark the current slot as written (odd sequence)
+        :return: None
+        """
+        self.framebuffer.header[self._slot] = 2 * self.frames + 1
+
+    def swap(self, shown=None) -> None:
+        """
+        Complete the current slot and continue drawing into the other one, never waits for the presenter process
+        :param shown: function called with the display time in ns once the presenter process displayed the frame
+                      (or None)
+        :return: None
+        """
+        self.frames += 1
+        self.framebuffer.header[self._slot] = 2 * self.frames
+        self._ready.set()
+
+        if shown:
+            self._unshown.append((self.frames, shown))
+        self._report_shown()
+
+        self._slot = (self._slot + 1) % SLOTS
+        self._begin()
+
+    def close(self) -> None:
+        """
+        Stop the presenter process and release the shared memory
+        :return: None
+        """
+        if self._process is None:
+            return
+
+        self._stop.set()
+        self._process.join()
+        self._process = None
+
+        self._report_shown()
+        self._unshown.clear()
+
+        self.canvases = []
+        self.framebuffer.close()
+
+    def __enter__(self):
+        """
+        Enter context, the presenter process is already running
+        :return: SplitPresenter object
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        Exit context and stop the presenter process
+        :param exc_type: exception type (or None)
+        :param exc_value: exception (or None)
+        :param traceback: traceback (or None)
+        :return: None
+        """
+        self.close()
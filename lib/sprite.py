@@ -0,0 +1,102 @@
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+
+class Sprite:
+    def __init__(self, icon: list = None, colors: dict = None, image: np.ndarray = None, mask: np.ndarray = None):
+        """
+        Sprite constructor, compiles icon once into RGB image and alpha mask (or uses a ready image)
+        :param icon: nested list of color indexes (0 is transparent)
+        :param colors: dict of color index to (red, green, blue)
+        :param image: RGB array of shape (height, width, 3) instead of icon, e.g. a sprite atlas frame
+        :param mask: bool array of shape (height, width), True for visible pixels of image
+        """
+        # index images per palette, compiled on first draw on an indexed canvas
+        self._index_images = WeakKeyDictionary()
+
+        if image is not None:
+            self.height, self.width = image.shape[:2]
+            self.image = image
+            self.mask = np.broadcast_to(mask[:, :, None], image.shape)
+            ys, xs = np.nonzero(mask)
+            self._lit = [(x, y, *image[y, x].tolist()) for y, x in zip(ys.tolist(), xs.tolist())]
+            return
+
+        self.height = len(icon)
+        self.width = len(icon[0])
+
+        self.image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self.mask = np.zeros((self.height, self.width, 3), dtype=bool)
+        self._lit = []
+
+        for y, row in enumerate(icon):
+            for x, c in enumerate(row):
+                if c:
+                    red, green, blue = colors[c]
+                    self.image[y, x] = (red, green, blue)
+                    self.mask[y, x] = True
+                    self._lit.append((x, y, red, green, blue))
+
+    def draw(self, canvas, x: int, y: int) -> None:
+        """
+        Blit sprite on canvas, clipped at canvas edges
+        :param canvas: canvas to display
+        :param x: x position of sprite top left corner
+        :param y: y position of sprite top left corner
+        :return: None
+        """
+        indices = getattr(canvas, 'indices', None)
+
+        if indices is not None:
+            self._blit(indices, self._index_image(canvas.palette), self.mask[:, :, 0], x, y)
+            return
+
+        pixels = getattr(canvas, 'pixels', None)
+
+        if pixels is None:
+            # hardware canvas has no alpha blit, use precompiled lit pixels
+            for dx, dy, red, green, blue in self._lit:
+                canvas.SetPixel(x + dx, y + dy, red, green, blue)
+            return
+
+        self._blit(pixels, self.image, self.mask, x, y)
+
+    def _index_image(self, palette) -> np.ndarray:
+        """
+        Get sprite image as palette indices
+        :param palette: Palette object
+        :return: array of palette indices
+        """
+        image = self._index_images.get(palette)
+
+        if image is None:
+            image = self._index_images[palette] = np.zeros((self.height, self.width), dtype=np.uint8)
+            for dx, dy, red, green, blue in self._lit:
+                image[dy, dx] = palette.index(red, green, blue)
+
+        return image
+
+    def _blit(self, target: np.ndarray, image: np.ndarray, mask: np.ndarray, x: int, y: int) -> None:
+        """
+        Copy masked image into target array, clipped at its edges
+        :param target: target array (RGB pixels or palette indices)
+        :param image: sprite image with the same trailing shape as target
+        :param mask: alpha mask with the shape of image
+        :param x: x position of sprite top left corner
+        :param y: y position of sprite top left corner
+        :return: None
+        """
+        height, width = target.shape[:2]
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + self.width, width), min(y + self.height, height)
+
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        if x1 == x and y1 == y and x2 - x == self.width and y2 - y == self.height:
+            np.copyto(target[y1:y2, x1:x2], image, where=mask)
+        else:
+            np.copyto(target[y1:y2, x1:x2],
+                      image[y1 - y:y2 - y, x1 - x:x2 - x],
+                      where=mask[y1 - y:y2 - y, x1 - x:x2 - x])
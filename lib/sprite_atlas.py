@@ -0,0 +1,246 @@
+from os import path
+from struct import Struct
+
+import numpy as np
+
+from lib.sprite import Sprite
+
+
+MAGIC = b'SPA1'
+
+# magic, number of sprites
+HEADER = Struct('<4sH')
+
+# name, number of frames, frame width, frame height, offset of the first frame in the pixel buffer
+ENTRY = Struct('<16sHHHI')
+
+# loaded atlases by path, shared by all games of a process
+_ATLASES = {}
+
+
+def _read_ppm(file_path: str) -> np.ndarray:
+    """
+    Read a netpbm color image (P3 text or P6 binary), black pixels are transparent
+    :param file_path: image file path
+    :return: RGBA array of shape (height, width, 4)
+    """
+    with open(file_path, 'rb') as image_file:
+        data = image_file.read()
+
+    # header tokens: magic, width, height, maximum value (comments start with #)
+    tokens = []
+    position = 0
+    while len(tokens) < 4:
+        while data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] == b'#':
+            position = data.index(b'\n', position)
+            continue
+
+        end = position
+        while end < len(data) and not data[end:end + 1].isspace():
+            end += 1
+        tokens.append(data[position:end])
+        position = end
+
+    magic, width, height, maximum = tokens[0], int(tokens[1]), int(tokens[2]), int(tokens[3])
+
+    if magic == b'P6' and maximum < 256:
+        rgb = np.frombuffer(data, dtype=np.uint8, count=width * height * 3, offset=position + 1)
+    elif magic == b'P3':
+        text = b'\n'.join(line.split(b'#')[0] for line in data[position:].splitlines())
+        rgb = np.array(text.split()[:width * height * 3], dtype=np.uint32)
+    else:
+        raise ValueError(f'{file_path} is not a supported PPM image')
+
+    rgb = (rgb.reshape(height, width, 3).astype(np.uint32) * 255 // maximum).astype(np.uint8)
+    alpha = np.where(rgb.any(axis=2), 255, 0).astype(np.uint8)
+
+    return np.dstack((rgb, alpha))
+
+
+def load_image(file_path: str) -> np.ndarray:
+    """
+    Read an image file, PPM is read directly, other formats need Pillow
+    :param file_path: image file path
+    :return: RGBA array of shape (height, width, 4)
+    """
+    if file_path.lower().endswith(('.ppm', '.pnm')):
+        return _read_ppm(file_path)
+
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError(f'reading {file_path} needs Pillow (python3-pil), or use a PPM image')
+
+    with Image.open(file_path) as image:
+        return np.asarray(image.convert('RGBA'))
+
+
+def pack_atlas(sprites: dict) -> bytes:
+    """
+    Pack sprite frames into atlas bytes, each frame as RGB bytes followed by one mask byte per pixel
+    :param sprites: dict of sprite name and list of RGBA frames (same size per sprite)
+    :return: atlas as bytes
+    """
+    entries = []
+    pixels = []
+    offset = 0
+
+    for name, frames in sprites.items():
+        height, width = frames[0].shape[:2]
+        entries.append(ENTRY.pack(name.encode('utf-8')[:16], len(frames), width, height, offset))
+
+        for frame in frames:
+            if frame.shape[:2] != (height, width):
+                raise ValueError(f'frames of sprite {name} differ in size')
+
+            mask = frame[:, :, 3] > 0
+            pixels.append(np.where(mask[:, :, None], frame[:, :, :3], 0).astype(np.uint8).tobytes())
+            pixels.append(mask.astype(np.uint8).tobytes())
+            offset += width * height * 4
+
+    return HEADER.pack(MAGIC, len(entries)) + b''.join(entries) + b''.join(pixels)
+
+
+def split_frames(image: np.ndarray, frame_width: int = None) -> list:
+    """
+    Split a sprite sheet into frames placed side by side
+    :param image: RGBA array of shape (height, width, 4)
+    :param frame_width: width of one frame (or None for a single frame)
+    :return: list of RGBA frames
+    """
+    width = image.shape[1]
+    frame_width = frame_width or width
+
+    if width % frame_width:
+        raise ValueError(f'sheet width {width} is not a multiple of frame width {frame_width}')
+
+    return [image[:, x:x + frame_width] for x in range(0, width, frame_width)]
+
+
+class SpriteAtlas:
+    def __init__(self, data: bytes):
+        """
+        SpriteAtlas constructor, frames are views into one pixel buffer, variants are created on first use
+        :param data: atlas bytes (see pack_atlas)
+        """
+        magic, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError('data is not a sprite atlas')
+
+        self._data = data
+        self._pixels = HEADER.size + count * ENTRY.size
+        self._entries = {}
+        self._variants = {}
+
+        for number in range(count):
+            name, frames, width, height, offset = ENTRY.unpack_from(data, HEADER.size + number * ENTRY.size)
+            self._entries[name.rstrip(b'\0').decode('utf-8')] = (frames, width, height, offset)
+
+    @property
+    def names(self) -> list:
+        """
+        Get sprite names
+        :return: list of names
+        """
+        return list(self._entries)
+
+    def frames(self, name: str) -> int:
+        """
+        Get number of animation frames of a sprite
+        :param name: sprite name
+        :return: count as integer
+        """
+        return self._entries[name][0]
+
+    def _frame(self, name: str, frame: int) -> tuple:
+        """
+        Get image and mask of a frame without copying
+        :param name: sprite name
+        :param frame: frame number (wraps around)
+        :return: tuple (RGB array, bool mask array)
+        """
+        frames, width, height, offset = self._entries[name]
+        start = self._pixels + offset + (frame % frames) * width * height * 4
+
+        image = np.frombuffer(self._data, dtype=np.uint8, count=width * height * 3, offset=start)
+        mask = np.frombuffer(self._data, dtype=np.bool_, count=width * height, offset=start + width * height * 3)
+
+        return image.reshape(height, width, 3), mask.reshape(height, width)
+
+    def sprite(self, name: str, frame: int = 0, flip_x: bool = False, flip_y: bool = False, recolor: dict = None,
+               tint: tuple = None, strength: float = .5) -> Sprite:
+        """
+        Get a sprite frame or a derived variant, each variant is created once
+        :param name: sprite name
+        :param frame: frame number (wraps around)
+        :param flip_x: mirror horizontally
+        :param flip_y: mirror vertically
+        :param recolor: dict of (red, green, blue) colors to replace (or None)
+        :param tint: (red, green, blue) color blended over the sprite, e.g. for damage (or None)
+        :param strength: tint blend factor 0.0 .. 1.0
+        :return: Sprite object
+        """
+        frame %= self._entries[name][0]
+        key = (name, frame, flip_x, flip_y, tuple(sorted(recolor.items())) if recolor else None, tint,
+               strength if tint else None)
+
+        sprite = self._variants.get(key)
+        if sprite is not None:
+            return sprite
+
+        image, mask = self._frame(name, frame)
+
+        if flip_x:
+            image, mask = image[:, ::-1], mask[:, ::-1]
+        if flip_y:
+            image, mask = image[::-1], mask[::-1]
+
+        if recolor:
+            source = image
+            image = image.copy()
+            for color, replacement in recolor.items():
+                image[np.all(source == color, axis=2)] = replacement
+
+        if tint:
+            image = np.rint(image * (1.0 - strength) + np.asarray(tint) * strength).astype(np.uint8)
+
+        sprite = self._variants[key] = Sprite(image=image, mask=mask)
+
+        return sprite
+
+
+def load_atlas(file_path: str) -> SpriteAtlas:
+    """
+    Load an atlas file once per process, later calls return the same atlas
+    :param file_path: atlas file path
+    :return: SpriteAtlas object
+    """
+    atlas = _ATLASES.get(file_path)
+
+    if atlas is None:
+        with open(file_path, 'rb') as atlas_file:
+            atlas = _ATLASES[file_path] = SpriteAtlas(atlas_file.read())
+
+    return atlas
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description='Pack sprite images into an atlas file')
+    parser.add_argument('output', help='atlas file')
+    parser.add_argument('images', nargs='+', help='image files, sprite sheets as path:frame_width')
+    args = parser.parse_args()
+
+    sheets = {}
+    for argument in args.images:
+        image_path, _, frame_width = argument.partition(':')
+        sprite_name = path.splitext(path.basename(image_path))[0]
+        sheets[sprite_name] = split_frames(load_image(image_path), int(frame_width) if frame_width else None)
+
+    with open(args.output, 'wb') as output_file:
+        output_file.write(pack_atlas(sheets))
+
+    print(f'packed {len(sheets)} sprites into {args.output}')
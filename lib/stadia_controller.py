@@ -2,6 +2,9 @@ from evdev import InputDevice, list_devices
 from sys import exit
 
 
+_gamepad = None
+
+
 def get_controller_path() -> str:
     """
     Get controller linux path
@@ -9,18 +12,43 @@ def get_controller_path() -> str:
     """
     input_path = ''
 
-    devices = [InputDevice(path) for path in list_devices()]
-    for device in devices:
+    for path in list_devices():
+        device = InputDevice(path)
         if device.name.startswith('Google LLC Stadia Controller'):
             input_path = device.path
+        device.close()
 
     return input_path
 
 
-device_path = get_controller_path()
+def get_gamepad():
+    """
+    Get controller device, opened on first call and kept open
+    :return: InputDevice object (or None if no controller found)
+    """
+    global _gamepad
+
+    if _gamepad is None:
+        device_path = get_controller_path()
+        if device_path:
+            _gamepad = InputDevice(device_path)
+
+    return _gamepad
+
+
+def __getattr__(name: str):
+    """
+    Open the controller lazily on first access of the module attribute gamepad
+    :param name: attribute name
+    :return: InputDevice object (exits the application if no controller found)
+    """
+    if name != 'gamepad':
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    gamepad = get_gamepad()
 
-if not device_path:
-    print('No Google Stadia controller found')
-    exit(1)
+    if not gamepad:
+        print('No Google Stadia controller found')
+        exit(1)
 
-gamepad = InputDevice(device_path)
+    return gamepad
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+
+from lib.sprite import Sprite
+
+
+DEFAULT_CAPACITY = 64
+
+
+class TextSurface:
+    def __init__(self, font, text: str, color: tuple):
+        """
+        TextSurface constructor, rasterizes a string once into a sprite
+        :param font: font object with glyph_pixels(char)
+        :param text: text to render
+        :param color: tuple (red, green, blue)
+        """
+        lit = []
+        advance = 0
+
+        for char in text:
+            pixels, width = font.glyph_pixels(char)
+            lit.extend((advance + x, y) for x, y in pixels)
+            advance += width
+
+        self.advance = advance
+        self.sprite = None
+        self.left = 0
+        self.top = 0
+
+        if lit:
+            self.left = min(x for x, _ in lit)
+            self.top = min(y for _, y in lit)
+            width = max(x for x, _ in lit) - self.left + 1
+            height = max(y for _, y in lit) - self.top + 1
+
+            icon = [[0] * width for _ in range(height)]
+            for x, y in lit:
+                icon[y - self.top][x - self.left] = 1
+
+            self.sprite = Sprite(icon, {1: color})
+
+    def draw(self, canvas, x: int, y: int) -> int:
+        """
+        Blit text on canvas with its baseline at y
+        :param canvas: canvas to draw on
+        :param x: start x coordinate
+        :param y: baseline y coordinate
+        :return: total advance width as integer
+        """
+        if self.sprite:
+            self.sprite.draw(canvas, x + self.left, y + self.top)
+
+        return self.advance
+
+
+class TextCache:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        TextCache constructor, LRU of rendered text surfaces keyed by (text, font, color)
+        :param capacity: maximum number of cached surfaces
+        """
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self) -> int:
+        """
+        Get number of cached surfaces
+        :return: count as integer
+        """
+        return len(self._surfaces)
+
+    def surface(self, font, text: str, color) -> TextSurface:
+        """
+        Get rendered text surface, rasterized on first use
+        :param font: font object with glyph_pixels(char)
+        :param text: text to render
+        :param color: Color object
+        :return: TextSurface object
+        """
+        key = (text, getattr(font, 'key', font), color.red, color.green, color.blue)
+        surface = self._surfaces.get(key)
+
+        if surface is None:
+            self.misses += 1
+            surface = TextSurface(font, text, (color.red, color.green, color.blue))
+            self._surfaces[key] = surface
+
+            if len(self._surfaces) > self.capacity:
+                self._surfaces.popitem(last=False)
+        else:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+
+        return surface
+
+    def draw(self, canvas, font, x: int, y: int, color, text: str) -> int:
+        """
+        Draw text with its baseline at y from the cache
+        :param canvas: canvas to draw on
+        :param font: font object with glyph_pixels(char)
+        :param x: start x coordinate
+        :param y: baseline y coordinate
+        :param color: Color object
+        :param text: text to draw
+        :return: total advance width as integer
+        """
+        return self.surface(font, text, color).draw(canvas, x, y)
+
+    def clear(self) -> None:
+        """
+        Remove all cached surfaces
+        :return: None
+        """
+        self._surfaces.clear()
@@ -0,0 +1,259 @@
+from argparse import ArgumentParser
+from itertools import product
+from json import load
+from os import close, cpu_count, environ, path, remove
+from subprocess import run
+from sys import executable, exit
+from tempfile import mkstemp
+from time import perf_counter, process_time
+
+from lib.matrix_profile import PROFILE, load_profile, save_profile
+
+
+# option values swept by default, pwm_lsb_nanoseconds below 130 and gpio_slowdown 0 tend to ghost or garble
+SWEEP = {
+    'pwm_bits': [7, 8, 9, 10, 11],
+    'pwm_dither_bits': [0, 1, 2],
+    'pwm_lsb_nanoseconds': [130, 200, 260],
+    'gpio_slowdown': [1, 2, 3, 4]
+}
+
+DEFAULT_MIN_REFRESH = 120
+DEFAULT_MIN_HEADROOM = 0.5
+DEFAULT_PERIOD = 0.075
+
+
+class SimulatedPanel:
+    def __init__(self, clock_ns: float = 20.0, row_ns: float = 1000.0, busy_wait_ns: float = 25000.0,
+                 cores: int = 1):
+        """
+        SimulatedPanel constructor, cost model of the rgbmatrix refresh loop for offline tuning
+        :param clock_ns: time to clock out one column at gpio_slowdown 0
+        :param row_ns: time to switch the row address and latch per bit plane
+        :param busy_wait_ns: longest busy waited part of a software pulse, the rest is slept
+        :param cores: CPU cores shared by refresh thread and game loop
+        """
+        self.name = 'simulated'
+        self.clock_ns = float(clock_ns)
+        self.row_ns = float(row_ns)
+        self.busy_wait_ns = float(busy_wait_ns)
+        self.cores = max(int(cores), 1)
+
+    def measure(self, settings: dict) -> dict:
+        """
+        Estimate refresh rate and CPU share of the refresh thread
+        :param settings: complete dict of matrix options
+        :return: dict with 'refresh_hz' and 'cpu_share'
+        """
+        columns = settings['cols'] * settings['chain_length']
+        # two rows are lit at once, parallel chains are clocked out together
+        scan_rows = settings['rows'] // 2
+        clock_out = columns * self.clock_ns * (settings['gpio_slowdown'] + 1) + self.row_ns
+
+        # dithered low bits are spread over following frames
+        planes = range(settings['pwm_dither_bits'], settings['pwm_bits'])
+        pulses = [settings['pwm_lsb_nanoseconds'] * 2 ** plane for plane in planes]
+
+        # software pulses sleep through long planes and busy wait the end, hardware pulses need no CPU
+        if settings['disable_hardware_pulsing']:
+            busy_pulses = sum(min(pulse, self.busy_wait_ns) for pulse in pulses)
+        else:
+            busy_pulses = 0
+
+        frame_ns = scan_rows * (len(planes) * clock_out + sum(pulses))
+        busy_ns = scan_rows * (len(planes) * clock_out + busy_pulses)
+
+        return {'refresh_hz': 1e9 / frame_ns, 'cpu_share': busy_ns / frame_ns / self.cores}
+
+    def close(self) -> None:
+        """
+        Release the measurement source (nothing to release)
+        :return: None
+        """
+
+
+class MatrixMeasurement:
+    def __init__(self, swaps: int = 200):
+        """
+        MatrixMeasurement constructor, measures on the connected panel (one matrix at a time, needs root)
+        :param swaps: number of vsync swaps per measurement
+        """
+        from lib.matrix_configuration import RGBMatrix, create_options
+
+        self.name = 'matrix'
+        self.swaps = int(swaps)
+
+        self._matrix_class = RGBMatrix
+        self._create_options = create_options
+
+    def measure(self, settings: dict) -> dict:
+        """
+        Measure refresh rate as vsync swap rate and CPU share as process time of the refresh thread
+        :param settings: complete dict of matrix options
+        :return: dict with 'refresh_hz' and 'cpu_share'
+        """
+        # rgbmatrix drops root with the first matrix, the next one could not access the GPIO anymore
+        matrix = self._matrix_class(options=self._create_options({'options': {**settings, 'drop_privileges': 0}}))
+        canvas = matrix.CreateFrameCanvas()
+        canvas = matrix.SwapOnVSync(canvas)
+
+        # main thread sleeps in SwapOnVSync, process time is spent by the refresh thread
+        start, start_cpu = perf_counter(), process_time()
+        for _ in range(self.swaps):
+            canvas = matrix.SwapOnVSync(canvas)
+        elapsed, elapsed_cpu = perf_counter() - start, process_time() - start_cpu
+
+        matrix.Clear()
+        del matrix
+
+        return {'refresh_hz': self.swaps / elapsed, 'cpu_share': elapsed_cpu / elapsed / (cpu_count() or 1)}
+
+    def close(self) -> None:
+        """
+        Release the measurement source (matrices are released after each measurement)
+        :return: None
+        """
+
+
+def measure_frame_ms(profile: str, games: list, ticks: int) -> float:
+    """
+    Measure the slowest game frame (p95) with the headless benchmark in a separate process
+    :param profile: profile name, selects the panel layout of the benchmark
+    :param games: game names
+    :param ticks: simulation steps per game
+    :return: frame time in milliseconds
+    """
+    handle, output = mkstemp(suffix='.json')
+    close(handle)
+
+    try:
+        run([executable, '-B', 'benchmark.py', *games, '--ticks', str(ticks), '--output', output],
+            cwd=path.dirname(path.abspath(__file__)),
+            env={**environ, 'MATRIX_PROFILE': profile},
+            check=True,
+            capture_output=True)
+
+        with open(output) as result_file:
+            results = load(result_file)
+    finally:
+        remove(output)
+
+    return max(result['latency_ms']['p95'] for result in results['games'].values())
+
+
+def headroom(frame_ms: float, period: float, cpu_share: float) -> float:
+    """
+    Get the share of the frame period left after the game frame, the game gets the CPU time the refresh loop leaves
+    (at least half, the kernel shares a busy core between both threads)
+    :param frame_ms: game frame time in milliseconds
+    :param period: frame period in seconds
+    :param cpu_share: CPU share of the refresh thread 0.0 .. 1.0
+    :return: headroom as float (negative if frames are too slow)
+    """
+    available = max(1.0 - cpu_share, 0.5)
+
+    return 1.0 - frame_ms / available / (period * 1000)
+
+
+def score(result: dict, min_refresh: float) -> tuple:
+    """
+    Get the rank of a result: accepted first, then color depth, then refresh rate and headroom
+    :param result: result of tune()
+    :param min_refresh: minimal refresh rate in Hz
+    :return: sort key as tuple
+    """
+    settings = result['settings']
+    depth = settings['pwm_bits'] - settings['pwm_dither_bits']
+
+    return result['accepted'], depth, min(result['refresh_hz'] / min_refresh, 2.0) + result['headroom']
+
+
+def tune(base: dict, source, sweep: dict, frame_ms: float, period: float, min_refresh: float,
+         min_headroom: float) -> list:
+    """
+    Measure all combinations of the swept options
+    :param base: dict of matrix options kept for all combinations
+    :param source: measurement source with measure(settings)
+    :param sweep: dict of option name and list of values
+    :param frame_ms: game frame time in milliseconds
+    :param period: frame period in seconds
+    :param min_refresh: minimal refresh rate in Hz
+    :param min_headroom: minimal headroom 0.0 .. 1.0
+    :return: list of result dicts, best first
+    """
+    results = []
+    names = list(sweep)
+
+    for values in product(*(sweep[name] for name in names)):
+        settings = dict(zip(names, values))
+        if settings.get('pwm_dither_bits', 0) >= settings.get('pwm_bits', base['pwm_bits']):
+            continue
+
+        measured = source.measure({**base, **settings})
+        frame_headroom = headroom(frame_ms, period, measured['cpu_share'])
+
+        results.append({
+            'settings': settings,
+            'refresh_hz': round(measured['refresh_hz'], 1),
+            'cpu_share': round(measured['cpu_share'], 3),
+            'headroom': round(frame_headroom, 3),
+            'accepted': measured['refresh_hz'] >= min_refresh and frame_headroom >= min_headroom
+        })
+
+    results.sort(key=lambda result: score(result, min_refresh), reverse=True)
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Sweep matrix options and write the best profile for the panel layout')
+    parser.add_argument('--profile', default=PROFILE, help='base profile name or json file')
+    parser.add_argument('--output', help='profile name to write (default: panel size, e.g. 128x64)')
+    parser.add_argument('--source', choices=['simulated', 'matrix'], default='simulated', help='measurement source')
+    parser.add_argument('--cores', type=int, default=1, help='CPU cores of the simulated panel')
+    parser.add_argument('--min-refresh', type=float, default=DEFAULT_MIN_REFRESH, help='minimal refresh rate in Hz')
+    parser.add_argument('--min-headroom', type=float, default=DEFAULT_MIN_HEADROOM, help='minimal frame headroom')
+    parser.add_argument('--period', type=float, default=DEFAULT_PERIOD, help='game frame period in seconds')
+    parser.add_argument('--frame-ms', type=float, help='game frame time (default: measured by benchmark.py)')
+    parser.add_argument('--games', nargs='*', default=['Pong', 'Snake', 'Starfighter'], help='games to measure')
+    parser.add_argument('--ticks', type=int, default=1000, help='benchmark steps per game')
+    for option, values in SWEEP.items():
+        parser.add_argument(f'--{option.replace("_", "-")}', type=int, nargs='+', default=values,
+                            help=f'values of {option}')
+    args = parser.parse_args()
+
+    base = load_profile(args.profile)['options']
+    sweep = {option: getattr(args, option) for option in SWEEP}
+    frame_ms = args.frame_ms if args.frame_ms is not None else measure_frame_ms(args.profile, args.games, args.ticks)
+
+    source = MatrixMeasurement() if args.source == 'matrix' else SimulatedPanel(cores=args.cores)
+    try:
+        results = tune(base, source, sweep, frame_ms, args.period, args.min_refresh, args.min_headroom)
+    finally:
+        source.close()
+
+    print(f'{"bits":>5}{"dither":>7}{"lsb ns":>8}{"slowdown":>9}{"refresh Hz":>12}{"cpu":>7}{"headroom":>10}')
+    for result in results[:10]:
+        settings = result['settings']
+        print(f'{settings["pwm_bits"]:>5}{settings["pwm_dither_bits"]:>7}{settings["pwm_lsb_nanoseconds"]:>8}'
+              f'{settings["gpio_slowdown"]:>9}{result["refresh_hz"]:>12.1f}{result["cpu_share"]:>7.2f}'
+              f'{result["headroom"]:>10.2f}{"" if result["accepted"] else "  (rejected)"}')
+
+    if not results or not results[0]['accepted']:
+        print(f'no combination reaches {args.min_refresh} Hz with {args.min_headroom} headroom')
+        exit(1)
+
+    best = results[0]
+    output = args.output or f'{base["cols"] * base["chain_length"]}x{base["rows"] * base["parallel"]}'
+    file_path = save_profile(output, {
+        'options': {**base, **best['settings']},
+        'tuning': {
+            'source': source.name,
+            'frame_ms': round(frame_ms, 3),
+            'period': args.period,
+            'refresh_hz': best['refresh_hz'],
+            'cpu_share': best['cpu_share'],
+            'headroom': best['headroom']
+        }
+    })
+    print(f'wrote {file_path}, run the games with MATRIX_PROFILE={output}')
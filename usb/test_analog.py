@@ -1,7 +1,6 @@
 from rgbmatrix import RGBMatrixOptions, RGBMatrix, graphics
 from evdev import InputDevice, list_devices, ecodes
-from threading import Thread
-from time import sleep
+import asyncio
 
 
 options = RGBMatrixOptions()
@@ -28,7 +27,9 @@ options.show_refresh_rate = False
 
 class Point:
     def __init__(self, panel):
-        self.x, self.y = 32, 16
+        # bounds of the whole chain, read once
+        self.max_x, self.max_y = panel.width - 1, panel.height - 1
+        self.x, self.y = panel.width // 2, panel.height // 2
         self.matrix = panel
         self._color = graphics.Color(200, 200, 200)
 
@@ -48,10 +49,10 @@ def get_controller_path() -> str:
     return device_path
 
 
-def handle_input() -> None:
+async def handle_input() -> None:
     global gamepad
 
-    for event in gamepad.read_loop():
+    async for event in gamepad.async_read_loop():
         if event.type == ecodes.EV_ABS:
             if event.code in [ecodes.ABS_X, ecodes.ABS_Y]:
                 if event.value > 245:
@@ -65,19 +66,34 @@ def handle_input() -> None:
 def update_point_position():
     global point
 
-    while True:
-        # Update the point's position based on the pressed states
-        if pressed_states[ecodes.ABS_X] == 1 and point.x < 63:
-            point.x += 1
-        elif pressed_states[ecodes.ABS_X] == -1 and point.x > 0:
-            point.x -= 1
+    # Update the point's position based on the pressed states
+    if pressed_states[ecodes.ABS_X] == 1 and point.x < point.max_x:
+        point.x += 1
+    elif pressed_states[ecodes.ABS_X] == -1 and point.x > 0:
+        point.x -= 1
 
-        if pressed_states[ecodes.ABS_Y] == 1 and point.y < 31:
-            point.y += 1
-        elif pressed_states[ecodes.ABS_Y] == -1 and point.y > 0:
-            point.y -= 1
+    if pressed_states[ecodes.ABS_Y] == 1 and point.y < point.max_y:
+        point.y += 1
+    elif pressed_states[ecodes.ABS_Y] == -1 and point.y > 0:
+        point.y -= 1
 
-        sleep(0.05)
+
+async def run() -> None:
+    # input and frame tick share one event loop, no threads
+    input_task = asyncio.create_task(handle_input())
+
+    try:
+        while True:
+            update_point_position()
+
+            matrix.Clear()
+
+            point.draw(screen=canvas)
+
+            matrix.SwapOnVSync(canvas)
+            await asyncio.sleep(0.075)
+    finally:
+        input_task.cancel()
 
 
 if __name__ == "__main__":
@@ -89,16 +105,4 @@ if __name__ == "__main__":
     gamepad = InputDevice(get_controller_path())
     pressed_states = {ecodes.ABS_X: 0, ecodes.ABS_Y: 0}
 
-    input_thread = Thread(target=handle_input, daemon=True)
-    input_thread.start()
-
-    update_thread = Thread(target=update_point_position, daemon=True)
-    update_thread.start()
-
-    while True:
-        matrix.Clear()
-
-        point.draw(screen=canvas)
-
-        matrix.SwapOnVSync(canvas)
-        sleep(0.075)
+    asyncio.run(run())